@@ -2,6 +2,6 @@
 App API Module - HTTP API for Knowledge Management Agent
 """
 
-from .api import create_app
+from .api import create_app, get_or_create_app
 
-__all__ = ["create_app"]
+__all__ = ["create_app", "get_or_create_app"]
@@ -10,14 +10,14 @@ Provides HTTP endpoints for:
 """
 
 import os
-import sys
 import time
-import traceback
 import logging
-from flask import Flask, request, g, make_response
-from flask_cors import CORS
+import mysql.connector
+from flask import Flask, request, g, make_response, abort
 from app_api import config
 from app_api.services.agent_service import init_services
+from app_api.services.json_provider import ORJSONProvider
+from app_api.services.logging_setup import configure_logging
 from app_api.routes.chat import chat_bp
 from app_api.routes.documents import documents_bp
 from app_api.routes.instructions import instructions_bp
@@ -31,34 +31,90 @@ from ks_infrastructure.services.user_info_service import (
     is_admin,
 )
 
-# Configure logging with enhanced format for call tracking
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - [%(name)s] %(levelname)s - %(message)s'
-)
+# Configure logging with enhanced format for call tracking (written off the request thread)
+configure_logging(os.getenv('LOG_LEVEL', 'INFO'))
 logger = logging.getLogger(__name__)
 
 # Enable debug level for conversation-related modules
 logging.getLogger('conversation_repository.db').setLevel(logging.DEBUG)
 logging.getLogger('km_agent.conversation_manager').setLevel(logging.DEBUG)
-logging.getLogger('app_api.routes.conversations').setLevel(logging.DEBUG)
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_BLUEPRINTS = (
+    chat_bp,
+    documents_bp,
+    instructions_bp,
+    images_bp,
+    health_bp,
+    quotes_bp,
+    conversations_bp,
+    reminders_bp,
+)
+
+# Endpoints that accept a multipart file upload
+_UPLOAD_ENDPOINTS = frozenset({'documents.upload_document', 'images.analyze_image'})
+
+# Upload endpoints that also accept a raw application/octet-stream body
+_RAW_UPLOAD_ENDPOINTS = frozenset({'documents.upload_document'})
+
+# CORS: origins allowed on /api/* and the constant preflight response headers
+_CORS_ORIGINS = frozenset({"http://localhost:8080", "http://127.0.0.1:8080"})
+_CORS_PREFLIGHT_HEADERS = {
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Filename",
+}
+
+# handle_exception categories, checked in order (first isinstance match wins)
+_EXCEPTION_CATEGORIES = (
+    (mysql.connector.Error, 'DATABASE_ERROR', '数据库错误', 500),
+    ((ValueError, KeyError, AttributeError), 'BUSINESS_LOGIC_ERROR', '业务逻辑错误', 400),
+    ((FileNotFoundError, PermissionError), 'FILE_SYSTEM_ERROR', '文件系统错误', 500),
+)
+
+
+def _classify_exception(e):
+    """Return (error code, message label, HTTP status) for an unhandled exception"""
+    # 端口冲突错误 (bind() raises a bare OSError)
+    if type(e) is OSError:
+        return 'PORT_CONFLICT', '端口已被占用', 500
+    for classes, error_code, label, status in _EXCEPTION_CATEGORIES:
+        if isinstance(e, classes):
+            return error_code, label, status
+    # 其他未知错误
+    return 'INTERNAL_SERVER_ERROR', '内部服务器错误', 500
+
+
+# App built by get_or_create_app()
+_app = None
 
-def create_app():
-    """Create and configure Flask app"""
+def create_app(init_services_on_startup: bool = True):
+    """
+    Create and configure Flask app
+
+    Args:
+        init_services_on_startup: Build the shared vectorizer immediately. Disabled
+            for gunicorn preload_app, where each worker builds them after fork.
+    """
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     app.config['MAX_CONTENT_LENGTH'] = config.MAX_CONTENT_LENGTH
 
-    # Enable CORS for cross-origin requests
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": ["http://localhost:8080", "http://127.0.0.1:8080"],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
-        }
-    })
+    # Enable CORS for cross-origin requests to /api/*
+    @app.before_request
+    def cors_preflight():
+        """Answer CORS preflight requests with constant headers, skipping the view"""
+        if (request.method == 'OPTIONS' and request.path.startswith('/api/')
+                and request.origin in _CORS_ORIGINS):
+            return app.response_class(status=204, headers=_CORS_PREFLIGHT_HEADERS)
+        return None
+
+    @app.after_request
+    def add_cors_headers(response):
+        """Allow whitelisted origins on /api/* responses"""
+        origin = request.origin
+        if origin in _CORS_ORIGINS and request.path.startswith('/api/'):
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.vary.add('Origin')
+        return response
 
     # Request tracking middleware
     @app.before_request
@@ -66,15 +122,20 @@ def create_app():
         """在请求开始前记录日志"""
         g.start_time = time.time()
 
-        logger.info("="*80)
-        logger.info(f"[请求开始] {request.method} {request.path}")
+        # 单行记录请求与管理员判定（不输出token）
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "[请求开始] method=%s path=%s is_admin=%s cookie_present=%s",
+                request.method, request.path, is_admin(), ADMIN_COOKIE_NAME in request.cookies
+            )
 
-        # 记录管理员判定（不输出token）
-        logger.info(f"[Admin检查] is_admin={is_admin()} cookie_present={bool(request.cookies.get(ADMIN_COOKIE_NAME))}")
+        # 请求参数/请求体仅在 DEBUG 级别记录
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
 
         # 记录请求参数
         if request.args:
-            logger.info(f"[URL参数] {dict(request.args)}")
+            logger.debug(f"[URL参数] {request.args.to_dict(flat=True)}")
 
         # 记录请求体 (非文件上传)
         if request.method in ['POST', 'PUT', 'PATCH']:
@@ -85,44 +146,63 @@ def create_app():
                     if isinstance(data, dict):
                         safe_data = {k: ('***' if 'password' in k.lower() or 'token' in k.lower() else v)
                                     for k, v in data.items()}
-                        logger.info(f"[请求体] {safe_data}")
+                        logger.debug(f"[请求体] {safe_data}")
                 except Exception as e:
                     logger.debug(f"无法解析请求体: {e}")
-            elif 'multipart/form-data' not in request.content_type:
-                logger.info(f"[请求体] Content-Type: {request.content_type}")
+            elif 'multipart/form-data' not in (request.content_type or ''):
+                logger.debug(f"[请求体] Content-Type: {request.content_type}")
 
-        logger.info("="*80)
+    @app.before_request
+    def reject_bad_uploads():
+        """Reject oversized / non-multipart uploads before the body is parsed"""
+        if request.endpoint not in _UPLOAD_ENDPOINTS:
+            return None
+
+        content_length = request.content_length
+        if content_length and content_length > app.config['MAX_CONTENT_LENGTH']:
+            abort(413)
+
+        if request.mimetype == 'application/octet-stream' and request.endpoint in _RAW_UPLOAD_ENDPOINTS:
+            return None
+
+        if request.mimetype != 'multipart/form-data':
+            return {
+                'success': False,
+                'error': 'Expected multipart/form-data'
+            }, 400
+        return None
 
     @app.after_request
     def log_request_end(response):
         """在请求结束后记录日志"""
+        if not logger.isEnabledFor(logging.INFO):
+            return response
+
         duration = time.time() - g.get('start_time', time.time())
 
-        logger.info("-"*80)
-        logger.info(f"[请求结束] {request.method} {request.path}")
-        logger.info(f"[状态码] {response.status_code}")
-        logger.info(f"[耗时] {duration:.3f}秒")
+        record = (
+            f"[请求结束] method={request.method} path={request.path} "
+            f"status={response.status_code} duration={duration:.3f}s"
+        )
 
         # 记录响应内容 (非流式响应)
         if response.content_type and 'text/event-stream' not in response.content_type:
             if response.is_json:
                 try:
                     resp_data = response.get_json()
-                    if isinstance(resp_data, dict):
-                        # 简化输出，只显示关键字段
-                        if 'success' in resp_data:
-                            response_info = f"[响应] success={resp_data.get('success')}"
-                            if 'error' in resp_data:
-                                response_info += f", error={resp_data.get('error')}"
-                            if 'message' in resp_data:
-                                response_info += f", message={resp_data.get('message')}"
-                            logger.info(response_info)
+                    # 简化输出，只显示关键字段
+                    if isinstance(resp_data, dict) and 'success' in resp_data:
+                        record += f" success={resp_data.get('success')}"
+                        if 'error' in resp_data:
+                            record += f" error={resp_data.get('error')}"
+                        if 'message' in resp_data:
+                            record += f" message={resp_data.get('message')}"
                 except Exception as e:
                     logger.debug(f"无法解析响应体: {e}")
         else:
-            logger.info("[响应] 流式响应 (SSE)")
+            record += " response=sse"
 
-        logger.info("-"*80)
+        logger.info(record)
         return response
 
     @app.errorhandler(413)
@@ -141,76 +221,31 @@ def create_app():
         """捕获并处理所有异常"""
         duration = time.time() - g.get('start_time', time.time())
 
-        logger.error("!"*80)
-        logger.error(f"[异常] {request.method} {request.path}")
-        logger.error(f"[异常类型] {type(e).__name__}")
-        logger.error(f"[异常信息] {str(e)}")
-        logger.error(f"[耗时] {duration:.3f}秒")
-        logger.error("[异常追踪]")
-        logger.error(traceback.format_exc())
-        logger.error("!"*80)
+        logger.error(
+            "[异常] method=%s path=%s type=%s duration=%.3fs error=%s",
+            request.method, request.path, type(e).__name__, duration, e,
+            exc_info=e
+        )
 
         # 区分不同类型的错误
         error_type = type(e).__name__
-        error_message = str(e)
-
-        # 端口冲突错误
-        if 'Address already in use' in error_message or 'OSError' in error_type:
-            return {
-                'success': False,
-                'error': 'PORT_CONFLICT',
-                'message': f'端口已被占用：{error_message}',
-                'details': {'type': error_type}
-            }, 500
-
-        # 数据库错误
-        if any(db_err in error_type for db_err in ['OperationalError', 'IntegrityError', 'DatabaseError', 'MySQLError']):
-            return {
-                'success': False,
-                'error': 'DATABASE_ERROR',
-                'message': f'数据库错误：{error_message}',
-                'details': {'type': error_type}
-            }, 500
-
-        # 业务逻辑错误 (ValueError, KeyError 等)
-        if error_type in ['ValueError', 'KeyError', 'AttributeError']:
-            return {
-                'success': False,
-                'error': 'BUSINESS_LOGIC_ERROR',
-                'message': f'业务逻辑错误：{error_message}',
-                'details': {'type': error_type}
-            }, 400
-
-        # 文件系统错误
-        if error_type in ['FileNotFoundError', 'PermissionError', 'IOError']:
-            return {
-                'success': False,
-                'error': 'FILE_SYSTEM_ERROR',
-                'message': f'文件系统错误：{error_message}',
-                'details': {'type': error_type}
-            }, 500
-
-        # 其他未知错误
+        error_code, label, status = _classify_exception(e)
         return {
             'success': False,
-            'error': 'INTERNAL_SERVER_ERROR',
-            'message': f'内部服务器错误：{error_message}',
+            'error': error_code,
+            'message': f'{label}：{e}',
             'details': {'type': error_type}
-        }, 500
+        }, status
 
     # Initialize services on app startup
-    with app.app_context():
-        init_services()
+    if init_services_on_startup:
+        with app.app_context():
+            init_services()
 
     # Register Blueprints
-    app.register_blueprint(chat_bp)
-    app.register_blueprint(documents_bp)
-    app.register_blueprint(instructions_bp)
-    app.register_blueprint(images_bp)
-    app.register_blueprint(health_bp)
-    app.register_blueprint(quotes_bp)
-    app.register_blueprint(conversations_bp)
-    app.register_blueprint(reminders_bp)
+    for bp in _BLUEPRINTS:
+        if bp.name not in app.blueprints:
+            app.register_blueprint(bp)
 
     @app.route('/admin', methods=['GET'])
     @app.route('/api/admin', methods=['GET'])
@@ -251,6 +286,19 @@ def create_app():
     return app
 
 
+def get_or_create_app(init_services_on_startup: bool = True):
+    """
+    Return a process-wide app, creating it on first use
+
+    Lets tests share one app instead of rebuilding the URL map and
+    re-registering every Blueprint per test case.
+    """
+    global _app
+    if _app is None:
+        _app = create_app(init_services_on_startup=init_services_on_startup)
+    return _app
+
+
 if __name__ == '__main__':
     app = create_app()
     print(f"Starting App API on {config.HOST}:{config.PORT}")
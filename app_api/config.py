@@ -2,6 +2,8 @@
 Configuration for App API
 """
 
+import os
+
 # Default User
 
 
@@ -9,6 +11,29 @@ Configuration for App API
 ALLOWED_EXTENSIONS = {'pdf', 'xlsx', 'xls'}
 MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB
 
+# JSON request bodies (instructions, quotes, reminders) are small; larger ones
+# are rejected from Content-Length before anything is read
+MAX_JSON_BODY_LENGTH = 64 * 1024
+
+# Upload Concurrency
+MAX_CONCURRENT_UPLOADS = 8  # Upload SSE streams per API process
+UPLOAD_RATE_LIMIT = 10  # Uploads per owner per window
+UPLOAD_RATE_WINDOW = 60  # seconds
+VECTORIZE_WORKER_CONCURRENCY = 2  # Vectorization tasks per Celery worker
+# Workers stage downloads in RAM-backed tmpfs when available (falls back to the
+# system temp dir when it is missing or low on space)
+VECTORIZE_TMPDIR = os.getenv('VECTORIZE_TMPDIR', '/dev/shm' if os.path.isdir('/dev/shm') else '')
+
+# KMAgent Cache
+KM_AGENT_CACHE_SIZE = 256  # Cached agents per API process (LRU)
+KM_AGENT_CACHE_TTL = 3600  # seconds
+
+# Document Content
+# Redirect /content requests to a presigned MinIO URL instead of proxying the
+# bytes through the API. Requires the MinIO endpoint to be reachable by clients.
+DOCUMENT_CONTENT_REDIRECT = False
+PRESIGNED_URL_EXPIRES = 300  # seconds
+
 # Flask Configuration
 DEBUG = True
 HOST = "0.0.0.0"
@@ -0,0 +1,61 @@
+"""
+Gunicorn configuration for App API
+
+SSE endpoints (/api/chat, /api/upload) hold a connection open for the whole
+stream, so the request timeout is disabled. The default gthread worker pays one
+thread per open stream; set GUNICORN_WORKER_CLASS=gevent (requires the gevent
+package) to serve streams as greenlets, up to GUNICORN_WORKER_CONNECTIONS per
+worker. With gevent the master is monkey-patched before the app is preloaded,
+and gRPC (used by the Qdrant client) is switched to its gevent-aware mode.
+"""
+
+import os
+import multiprocessing
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # Must run before the app (and anything using sockets/threads) is imported
+    from gevent import monkey
+    monkey.patch_all()
+    from grpc.experimental import gevent as grpc_gevent
+    grpc_gevent.init_gevent()
+
+from app_api import config
+
+bind = f"{config.HOST}:{config.PORT}"
+workers = int(os.getenv("GUNICORN_WORKERS", str(2 * multiprocessing.cpu_count() + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "32"))  # gthread only
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))  # gevent only
+timeout = 0  # Streaming responses may legitimately run for minutes
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "75"))  # Outlive typical proxy idle timeouts
+accesslog = "-"
+errorlog = "-"
+
+# Import the app (and heavy libraries such as qdrant_client, openai, PyMuPDF,
+# pandas) once in the master so workers share the loaded code copy-on-write.
+preload_app = True
+
+
+def post_fork(server, worker):
+    """
+    Build network-backed services inside each worker
+
+    Only imported code and the Flask app object are meant to be shared from the
+    master: repositories check their tables lazily, so importing them opens no
+    MySQL connection. Sockets are not fork-safe (gRPC channels in particular),
+    so cached ks_infrastructure clients are dropped and services are created
+    per worker. Should the master still hold a MySQL pool, the worker drops it
+    without closing it (closing would shut down sockets shared with the master
+    and the other workers) and builds its own pool on first use.
+    The log listener thread is not inherited either and is restarted first.
+    """
+    from ks_infrastructure.services import clear_instances
+    from ks_infrastructure.services.mysql_service import discard_mysql_pool_after_fork
+    from app_api.services.agent_service import init_services
+    from app_api.services.logging_setup import start_log_listener
+
+    start_log_listener()
+    clear_instances()
+    discard_mysql_pool_after_fork()
+    init_services()
@@ -1,10 +1,35 @@
-from flask import Blueprint, request, Response, stream_with_context, jsonify
-import json
-from app_api.services.agent_service import get_or_create_km_agent
+import logging
+from flask import Blueprint, jsonify
+import msgspec
+from app_api.services.agent_service import acquire_km_agent
+from app_api.services.instruction_cache import get_cached_instructions
+from app_api.services.validators import ChatRequest, parse_json_body
+from app_api.services.sse import sse_event, sse_response
 from ks_infrastructure import get_current_user
 
+logger = logging.getLogger(__name__)
+
 chat_bp = Blueprint('chat', __name__)
 
+
+def _chat_stream(km_agent_instance, user_message, history, mode, stream_content):
+    """Generate SSE stream from agent"""
+    try:
+        for chunk in km_agent_instance.chat_stream(
+            user_message,
+            history,
+            mode=mode,
+            stream_content=stream_content
+        ):
+            yield sse_event(chunk)
+    except Exception as e:
+        error_chunk = {
+            "type": "error",
+            "data": {"error": str(e)}
+        }
+        yield sse_event(error_chunk)
+
+
 @chat_bp.route('/api/chat', methods=['POST'])
 def chat():
     """
@@ -29,69 +54,56 @@ def chat():
     - done: Final result with history and conversation_id
     """
     try:
-        data = request.get_json()
-        print(f"\n[DEBUG] Received chat request: {data}", flush=True)
-
-        if not data or 'message' not in data:
+        try:
+            data = parse_json_body(ChatRequest)
+        except msgspec.DecodeError as e:
             return jsonify({
                 "success": False,
-                "error": "Missing 'message' in request body"
+                "error": f"Invalid request body: {e}"
             }), 400
+        logger.debug("Received chat request: %s", data)
 
-        user_message = data['message']
-        history = data.get('history', None)
-        conversation_id = data.get('conversation_id')
-        enable_history = data.get('enable_history', False)
-        mode = data.get('mode', None)
-        stream_content = data.get('stream_content', True)
+        user_message = data.message
+        history = data.history
+        conversation_id = data.conversation_id
+        enable_history = data.enable_history
+        mode = data.mode
+        stream_content = data.stream_content
 
         # 提醒模式：改写query添加特殊要求前缀
         if mode == 'reminder':
             user_message = f"使用【提醒模式特殊要求】{user_message}"
-            print(f"[DEBUG] Reminder mode: query rewritten with special prefix", flush=True)
+            logger.debug("Reminder mode: query rewritten with special prefix")
 
         owner = get_current_user() # Always use trusted user from server
-        print(f"[DEBUG] Using owner: {owner}", flush=True)
-        print(f"[DEBUG] Conversation ID: {conversation_id}", flush=True)
-        print(f"[DEBUG] Enable history: {enable_history}", flush=True)
-        print(f"[DEBUG] Mode: {mode}", flush=True)
-        print(f"[DEBUG] Stream content: {stream_content}", flush=True)
+        logger.debug(
+            "Chat owner=%s conversation_id=%s enable_history=%s mode=%s stream_content=%s",
+            owner, conversation_id, enable_history, mode, stream_content
+        )
 
-        # Get or create KMAgent instance for the specific owner
-        km_agent_instance = get_or_create_km_agent(
+        # Get or create KMAgent instance for the specific owner; it stays
+        # locked to this request until the response is closed
+        km_agent_instance, release_agent = acquire_km_agent(
             owner=owner,
             conversation_id=conversation_id,
             enable_history=enable_history
         )
-        
-        # Reload instructions to ensure we have the latest ones
-        km_agent_instance.reload_instructions()
+        try:
+            # Refresh instructions (cached per owner, invalidated on instruction changes)
+            km_agent_instance.reload_instructions(get_cached_instructions(owner))
 
-        def generate_stream():
-            """Generate SSE stream from agent"""
-            try:
-                for chunk in km_agent_instance.chat_stream(
-                    user_message,
-                    history,
-                    mode=mode,
-                    stream_content=stream_content
-                ):
-                    yield f"data: {json.dumps(chunk)}\n\n"
-            except Exception as e:
-                error_chunk = {
-                    "type": "error",
-                    "data": {"error": str(e)}
-                }
-                yield f"data: {json.dumps(error_chunk)}\n\n"
-
-        return Response(
-            stream_with_context(generate_stream()),
-            mimetype='text/event-stream',
-            headers={
-                'Cache-Control': 'no-cache',
-                'X-Accel-Buffering': 'no'
-            }
-        )
+            response = sse_response(_chat_stream(
+                km_agent_instance,
+                user_message,
+                history,
+                mode,
+                stream_content
+            ))
+            response.call_on_close(release_agent)
+        except Exception:
+            release_agent()
+            raise
+        return response
 
     except Exception as e:
         return jsonify({
@@ -3,24 +3,65 @@
 提供会话的CRUD操作接口
 """
 
+import base64
 import logging
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from ks_infrastructure import get_current_user
 from conversation_repository import (
     create_conversation,
     get_conversation,
-    list_conversations,
-    count_conversations,
+    list_conversations_with_total,
+    list_conversations_after,
     update_conversation_title,
     delete_conversation,
     get_conversation_history,
     search_conversations,
 )
+from app_api.services.conversation_cache import (
+    get_conversation_owner,
+    invalidate_conversation_owner,
+)
 
 logger = logging.getLogger(__name__)
 conversations_bp = Blueprint('conversations', __name__)
 
 
+def _encode_cursor(row) -> str:
+    """Opaque cursor pointing after a conversation row: base64("updated_at|id")"""
+    raw = f"{row['updated_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    """Inverse of _encode_cursor; raises ValueError on malformed input"""
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    updated_at, row_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(updated_at), int(row_id)
+
+
+def _cursor_page(owner: str, limit: int, cursor: str):
+    """Keyset-paginated conversation list response for ?cursor= (empty: first page)"""
+    try:
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "error": "Invalid cursor"
+        }), 400
+
+    conversations = list_conversations_after(owner, limit, after)
+    next_cursor = _encode_cursor(conversations[-1]) if len(conversations) == limit else None
+    return jsonify({
+        "success": True,
+        "data": {
+            "conversations": conversations,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
+    })
+
+
 @conversations_bp.route('/api/conversations', methods=['GET'])
 def get_conversations():
     """
@@ -28,9 +69,20 @@ def get_conversations():
 
     Query Parameters:
         limit: 每页数量(默认20)
-        offset: 偏移量(默认0)
+        cursor: 游标分页(推荐)。首页传空值，之后传上一页返回的 next_cursor
+        offset: 偏移量(默认0，已不推荐，翻页越深越慢)
 
-    Response:
+    Response (cursor):
+        {
+            "success": true,
+            "data": {
+                "conversations": [...],
+                "limit": 20,
+                "next_cursor": "..."  // 没有更多数据时为 null
+            }
+        }
+
+    Response (offset):
         {
             "success": true,
             "data": {
@@ -41,11 +93,11 @@ def get_conversations():
             }
         }
     """
-    logger.debug(f"→ 调用 conversations.get_conversations()")
+    logger.debug("→ 调用 conversations.get_conversations()")
     try:
-        logger.debug(f"  → 调用 ks_infrastructure.get_current_user()")
+        logger.debug("  → 调用 ks_infrastructure.get_current_user()")
         owner = get_current_user()
-        logger.debug(f"  ← 返回 owner={owner}")
+        logger.debug("  ← 返回 owner=%s", owner)
 
         limit = request.args.get('limit', 20, type=int)
         offset = request.args.get('offset', 0, type=int)
@@ -53,15 +105,14 @@ def get_conversations():
         # 限制每页最大数量
         limit = min(limit, 100)
 
-        logger.debug(f"  → 调用 conversation_repository.list_conversations(owner={owner}, limit={limit}, offset={offset})")
-        conversations = list_conversations(owner, limit, offset)
-        logger.debug(f"  ← 返回 {len(conversations)} 个会话")
+        if 'cursor' in request.args:
+            return _cursor_page(owner, limit, request.args['cursor'])
 
-        logger.debug(f"  → 调用 conversation_repository.count_conversations(owner={owner})")
-        total = count_conversations(owner)
-        logger.debug(f"  ← 返回 total={total}")
+        logger.debug("  → 调用 conversation_repository.list_conversations_with_total(owner=%s, limit=%s, offset=%s)", owner, limit, offset)
+        conversations, total = list_conversations_with_total(owner, limit, offset)
+        logger.debug("  ← 返回 %s 个会话, total=%s", len(conversations), total)
 
-        logger.debug(f"← 返回成功响应")
+        logger.debug("← 返回成功响应")
         return jsonify({
             "success": True,
             "data": {
@@ -98,21 +149,21 @@ def create_new_conversation():
             }
         }
     """
-    logger.debug(f"→ 调用 conversations.create_new_conversation()")
+    logger.debug("→ 调用 conversations.create_new_conversation()")
     try:
-        logger.debug(f"  → 调用 ks_infrastructure.get_current_user()")
+        logger.debug("  → 调用 ks_infrastructure.get_current_user()")
         owner = get_current_user()
-        logger.debug(f"  ← 返回 owner={owner}")
+        logger.debug("  ← 返回 owner=%s", owner)
 
         data = request.get_json() or {}
         title = data.get('title')
-        logger.debug(f"  请求参数: title={title}")
+        logger.debug("  请求参数: title=%s", title)
 
-        logger.debug(f"  → 调用 conversation_repository.create_conversation(owner={owner}, title={title})")
+        logger.debug("  → 调用 conversation_repository.create_conversation(owner=%s, title=%s)", owner, title)
         conversation_id = create_conversation(owner, title)
-        logger.debug(f"  ← 返回 conversation_id={conversation_id}")
+        logger.debug("  ← 返回 conversation_id=%s", conversation_id)
 
-        logger.debug(f"← 返回成功响应")
+        logger.debug("← 返回成功响应")
         return jsonify({
             "success": True,
             "data": {
@@ -146,18 +197,18 @@ def get_conversation_detail(conversation_id):
             }
         }
     """
-    logger.debug(f"→ 调用 conversations.get_conversation_detail(conversation_id={conversation_id})")
+    logger.debug("→ 调用 conversations.get_conversation_detail(conversation_id=%s)", conversation_id)
     try:
-        logger.debug(f"  → 调用 ks_infrastructure.get_current_user()")
+        logger.debug("  → 调用 ks_infrastructure.get_current_user()")
         owner = get_current_user()
-        logger.debug(f"  ← 返回 owner={owner}")
+        logger.debug("  ← 返回 owner=%s", owner)
 
-        logger.debug(f"  → 调用 conversation_repository.get_conversation(conversation_id={conversation_id})")
+        logger.debug("  → 调用 conversation_repository.get_conversation(conversation_id=%s)", conversation_id)
         conversation = get_conversation(conversation_id)
-        logger.debug(f"  ← 返回 conversation={conversation}")
+        logger.debug("  ← 返回 conversation=%s", conversation)
 
         if not conversation:
-            logger.debug(f"← 返回404: 会话不存在")
+            logger.debug("← 返回404: 会话不存在")
             return jsonify({
                 "success": False,
                 "error": "Conversation not found"
@@ -165,13 +216,13 @@ def get_conversation_detail(conversation_id):
 
         # 验证所有权
         if conversation['owner'] != owner:
-            logger.debug(f"← 返回403: 权限不足 (owner={conversation['owner']}, current_user={owner})")
+            logger.debug("← 返回403: 权限不足 (owner=%s, current_user=%s)", conversation['owner'], owner)
             return jsonify({
                 "success": False,
                 "error": "Permission denied"
             }), 403
 
-        logger.debug(f"← 返回成功响应")
+        logger.debug("← 返回成功响应")
         return jsonify({
             "success": True,
             "data": conversation
@@ -202,55 +253,45 @@ def get_conversation_messages(conversation_id):
             }
         }
     """
-    logger.debug(f"→ 调用 conversations.get_conversation_messages(conversation_id={conversation_id})")
+    logger.debug("→ 调用 conversations.get_conversation_messages(conversation_id=%s)", conversation_id)
     try:
-        logger.debug(f"  → 调用 ks_infrastructure.get_current_user()")
+        logger.debug("  → 调用 ks_infrastructure.get_current_user()")
         owner = get_current_user()
-        logger.debug(f"  ← 返回 owner={owner}")
+        logger.debug("  ← 返回 owner=%s", owner)
 
         limit = request.args.get('limit', type=int)
-        logger.debug(f"  请求参数: limit={limit}")
+        logger.debug("  请求参数: limit=%s", limit)
 
         # 验证会话所有权
-        logger.debug(f"  → 调用 conversation_repository.get_conversation(conversation_id={conversation_id})")
-        conversation = get_conversation(conversation_id)
-        logger.debug(f"  ← 返回 conversation={conversation}")
+        logger.debug("  → 调用 get_conversation_owner(conversation_id=%s)", conversation_id)
+        conversation_owner = get_conversation_owner(conversation_id)
+        logger.debug("  ← 返回 conversation_owner=%s", conversation_owner)
 
-        if not conversation:
-            logger.debug(f"← 返回404: 会话不存在")
+        if conversation_owner is None:
+            logger.debug("← 返回404: 会话不存在")
             return jsonify({
                 "success": False,
                 "error": "Conversation not found"
             }), 404
 
-        if conversation['owner'] != owner:
-            logger.debug(f"← 返回403: 权限不足")
+        if conversation_owner != owner:
+            logger.debug("← 返回403: 权限不足")
             return jsonify({
                 "success": False,
                 "error": "Permission denied"
             }), 403
 
-        logger.debug(f"  → 调用 conversation_repository.get_conversation_history(conversation_id={conversation_id}, limit={limit})")
-        messages = get_conversation_history(conversation_id, limit)
-        
-        # 过滤掉内部消息(工具调用、系统提示词等)，只返回面向用户的对话历史
-        # 1. 保留用户消息
-        # 2. 保留有内容的助手消息(过滤掉纯工具调用的助手消息)
-        filtered_messages = [
-            msg for msg in messages
-            if msg['role'] == 'user' or (
-                msg['role'] == 'assistant' and msg.get('content') and msg['content'].strip()
-            )
-        ]
-        
-        logger.debug(f"  ← 返回 {len(filtered_messages)} 条消息 (过滤前 {len(messages)} 条)")
+        # 只返回面向用户的对话历史(用户消息 + 有内容的助手消息)，内部消息在 SQL 中过滤
+        logger.debug("  → 调用 conversation_repository.get_conversation_history(conversation_id=%s, limit=%s, user_visible_only=True)", conversation_id, limit)
+        messages = get_conversation_history(conversation_id, limit, user_visible_only=True)
+        logger.debug("  ← 返回 %s 条消息", len(messages))
 
-        logger.debug(f"← 返回成功响应")
+        logger.debug("← 返回成功响应")
         return jsonify({
             "success": True,
             "data": {
                 "conversation_id": conversation_id,
-                "messages": filtered_messages
+                "messages": messages
             }
         })
 
@@ -288,14 +329,14 @@ def update_conversation(conversation_id):
             }), 400
         
         # 验证会话所有权
-        conversation = get_conversation(conversation_id)
-        if not conversation:
+        conversation_owner = get_conversation_owner(conversation_id)
+        if conversation_owner is None:
             return jsonify({
                 "success": False,
                 "error": "Conversation not found"
             }), 404
         
-        if conversation['owner'] != owner:
+        if conversation_owner != owner:
             return jsonify({
                 "success": False,
                 "error": "Permission denied"
@@ -333,14 +374,14 @@ def delete_conversation_endpoint(conversation_id):
         owner = get_current_user()
         
         # 验证会话所有权
-        conversation = get_conversation(conversation_id)
-        if not conversation:
+        conversation_owner = get_conversation_owner(conversation_id)
+        if conversation_owner is None:
             return jsonify({
                 "success": False,
                 "error": "Conversation not found"
             }), 404
         
-        if conversation['owner'] != owner:
+        if conversation_owner != owner:
             return jsonify({
                 "success": False,
                 "error": "Permission denied"
@@ -349,6 +390,7 @@ def delete_conversation_endpoint(conversation_id):
         success = delete_conversation(conversation_id)
         
         if success:
+            invalidate_conversation_owner(conversation_id)
             return jsonify({"success": True})
         else:
             return jsonify({
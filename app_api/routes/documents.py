@@ -1,18 +1,97 @@
-import os
 import time
-import json
-import threading
+import shutil
 import tempfile
+import hashlib
+import unicodedata
+import orjson
+import uuid
 import logging
-from io import BytesIO
-from flask import Blueprint, request, jsonify, Response, stream_with_context, send_file
+import msgspec
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
+from flask import Blueprint, request, jsonify, Response, redirect
 import file_repository
-from app_api.services.validators import allowed_file
+from app_api import config
+from app_api.services.validators import (
+    allowed_file,
+    has_valid_signature,
+    content_digest,
+    safe_filename,
+    VisibilityRequest,
+    parse_json_body,
+)
 from app_api.services.agent_service import get_vectorizer
+from app_api.services.document_cache import (
+    get_cached_document_list,
+    set_cached_document_list,
+    invalidate_document_list,
+)
+from app_api.services.upload_limits import upload_slots, check_upload_rate
+from app_api.services.sse import sse_event, sse_raw_event, sse_response
+from app_api.services.vectorize_tasks import vectorize_document_task, progress_channel, queued_task_count
 from ks_infrastructure import get_current_user, is_admin
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
 
 documents_bp = Blueprint('documents', __name__)
 
+# Runs independent backend calls of a single request concurrently
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='documents-io')
+
+_CONTENT_CHUNK_SIZE = 1 << 20
+
+_RAW_UPLOAD_CHUNK_SIZE = 1 << 20
+_SPOOL_MAX_SIZE = 8 * 1024 * 1024  # Raw uploads above this spill to a temp file
+
+# Intermediate upload progress snapshots within one stage are sent at most once per window (seconds)
+_PROGRESS_COALESCE_WINDOW = 0.1
+
+# Idle upload streams get an SSE comment this often so proxies keep them open (seconds)
+_KEEPALIVE_INTERVAL = 15
+_KEEPALIVE_FRAME = b": ping\n\n"
+
+# Constant SSE frames, encoded once at import
+_TIMEOUT_FRAME = sse_event({
+    "stage": "error",
+    "error": "处理超时，请检查文档大小或稍后重试",
+    "progress_percent": 0
+})
+
+
+def _set_inline_disposition(response, filename):
+    """Content-Disposition: inline, with an RFC 5987 filename for non-ASCII names"""
+    try:
+        filename.encode('ascii')
+        response.headers.set('Content-Disposition', 'inline', filename=filename)
+    except UnicodeEncodeError:
+        response.headers.set(
+            'Content-Disposition', 'inline',
+            filename=unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii'),
+            **{'filename*': f"UTF-8''{quote(filename)}"}
+        )
+
+
+_DOCUMENT_LIST_FIELDS = ["filename", "owner", "is_public", "file_size", "created_at", "content_type"]
+
+
+def _set_validators(response, obj):
+    """Copy the MinIO object's ETag/Last-Modified onto the response"""
+    if obj['etag']:
+        response.headers['ETag'] = obj['etag']  # Already quoted by MinIO
+    if obj['last_modified']:
+        response.last_modified = obj['last_modified']
+
+
+def _conditional_json(body):
+    """JSON response with a content-hash ETag; answers If-None-Match with 304"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.blake2b(body, digest_size=8).hexdigest())
+    return response.make_conditional(request)
+
+
 @documents_bp.route('/api/documents', methods=['GET'])
 def get_documents():
     """
@@ -38,31 +117,27 @@ def get_documents():
     try:
         owner = get_current_user()
 
-        # Get document list from file_repository
+        cached = get_cached_document_list(owner)
+        if cached is not None:
+            return _conditional_json(cached)
+
+        # Get document list from file_repository (only the fields we return)
         files = file_repository.get_owner_file_list(
             owner=owner,
-            include_public=True
+            include_public=True,
+            fields=_DOCUMENT_LIST_FIELDS
         )
 
-        # Format response
-        documents = [
-            {
-                "filename": f["filename"],
-                "owner": f["owner"],
-                "is_public": f["is_public"],
-                "file_size": f["file_size"],
-                "created_at": f["created_at"].isoformat() if f.get("created_at") else None,
-                "content_type": f.get("content_type")
-            }
-            for f in files
-        ]
-
-        return jsonify({
+        # orjson serializes the rows (and their datetimes) directly
+        body = orjson.dumps({
             "success": True,
             "owner": owner,
-            "count": len(documents),
-            "documents": documents
+            "count": len(files),
+            "documents": files
         })
+        set_cached_document_list(owner, body)
+
+        return _conditional_json(body)
 
     except Exception as e:
         return jsonify({
@@ -71,12 +146,142 @@ def get_documents():
         }), 500
 
 
+def _upload_stream(stream, owner, filename, file_ext, content_type, is_public, file_hash):
+    """Generate SSE progress updates relayed from the Celery worker"""
+    task_id = str(uuid.uuid4())
+    pubsub = None
+
+    try:
+        # Identical re-upload of a fully vectorized document: the stored object
+        # and vectors already match, so only the public flag may change
+        if get_vectorizer().has_document(filename, owner, file_hash):
+            file_repository.set_file_public(owner, filename, is_public)
+            invalidate_document_list(owner, all_owners=True)
+            yield sse_event({
+                "stage": "completed",
+                "progress_percent": 100,
+                "message": "文档内容未变化，已跳过向量化",
+                "deduped": True,
+                "data": {"filename": filename, "owner": owner}
+            })
+            return
+
+        # 1. Upload to MinIO + save metadata to MySQL (upload_file rewinds the stream)
+        file_repository.upload_file(
+            username=owner,
+            filename=filename,
+            file_data=stream,
+            bucket='kms',
+            content_type=content_type,
+            is_public=is_public
+        )
+        invalidate_document_list(owner, all_owners=(is_public == 1))
+
+        # 2. Subscribe before enqueueing so that no progress event is missed
+        pubsub = ks_redis(decode_responses=False).pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(progress_channel(task_id))
+
+        # 3. Enqueue vectorization on the Celery worker pool
+        task = vectorize_document_task.apply_async(
+            args=(owner, filename, file_ext, file_hash),
+            task_id=task_id
+        )
+
+        # Tell the client it is waiting for a worker slot until the first worker event
+        yield sse_event({
+            "stage": "queued",
+            "progress_percent": 0,
+            "message": "等待向量化任务开始",
+            "queue_length": queued_task_count()
+        })
+
+        # 4. Relay progress events and send SSE updates
+        timeout = 300  # 5 minutes maximum
+        deadline = time.time() + timeout
+        last_sent_at = time.monotonic()
+        pending = None  # Latest snapshot held back by coalescing
+        last_stage = "queued"
+
+        while True:
+            # Check timeout
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                yield _TIMEOUT_FRAME
+                break
+
+            # Block until the worker publishes an update (wake up periodically
+            # to detect a crashed task, or when a held-back snapshot is due)
+            if pending is None:
+                wait = min(remaining, 1.0)
+            else:
+                wait = max(_PROGRESS_COALESCE_WINDOW - (time.monotonic() - last_sent_at), 0)
+            message = pubsub.get_message(timeout=wait)
+            if message is None:
+                if pending is not None:
+                    yield sse_raw_event(pending)
+                    pending = None
+                    last_sent_at = time.monotonic()
+                    continue
+                if time.monotonic() - last_sent_at >= _KEEPALIVE_INTERVAL:
+                    yield _KEEPALIVE_FRAME
+                    last_sent_at = time.monotonic()
+                if task.ready():
+                    # Task finished but its final event was not received:
+                    # report the task outcome from the result backend instead
+                    if task.successful():
+                        yield sse_event(task.result)
+                    else:
+                        error_msg = {
+                            "stage": "error",
+                            "error": f"处理过程异常终止: {task.result}",
+                            "progress_percent": 0
+                        }
+                        yield sse_event(error_msg)
+                    break
+                continue
+
+            # 5. Forward the worker's JSON as-is; the final result and stage
+            # transitions are sent immediately, other snapshots at most once per window
+            raw_data = message['data']
+            stage = orjson.loads(raw_data).get('stage')
+            if stage in ('completed', 'error'):
+                yield sse_raw_event(raw_data)
+                break
+
+            now = time.monotonic()
+            if stage == last_stage and now - last_sent_at < _PROGRESS_COALESCE_WINDOW:
+                pending = raw_data
+                continue
+
+            yield sse_raw_event(raw_data)
+            pending = None
+            last_sent_at = now
+            last_stage = stage
+
+    except Exception as e:
+        error_msg = {
+            "stage": "error",
+            "error": str(e),
+            "progress_percent": 0
+        }
+        yield sse_event(error_msg)
+
+    finally:
+        if pubsub is not None:
+            pubsub.close()
+
+
 @documents_bp.route('/api/upload', methods=['POST'])
 def upload_document():
     """
     Upload document (PDF, Excel) and vectorize with SSE progress updates
 
-    Form data:
+    Preferred: raw body with Content-Type: application/octet-stream
+    - Body: Document bytes (PDF, XLSX, XLS)
+    - X-Filename header or ?filename=: URL-encoded filename
+    - ?is_public=: 0 or 1 (default: 0)
+
+    Also accepted: multipart/form-data
     - file: Document file (PDF, XLSX, XLS)
     - is_public: 0 or 1 (default: 0)
 
@@ -90,22 +295,30 @@ def upload_document():
     ...
     data: {"stage": "completed", "progress": 100, "result": {...}}
     """
-    # Check if file is present
-    if 'file' not in request.files:
-        return jsonify({
-            "success": False,
-            "error": "No file provided"
-        }), 400
+    raw_upload = request.mimetype == 'application/octet-stream'
+
+    if raw_upload:
+        raw_filename = unquote(request.headers.get('X-Filename') or request.args.get('filename', ''))
+        raw_is_public = request.args.get('is_public', 0)
+    else:
+        # Check if file is present
+        if 'file' not in request.files:
+            return jsonify({
+                "success": False,
+                "error": "No file provided"
+            }), 400
 
-    file = request.files['file']
+        file = request.files['file']
+        raw_filename = file.filename
+        raw_is_public = request.form.get('is_public', 0)
 
-    if file.filename == '':
+    if raw_filename == '':
         return jsonify({
             "success": False,
             "error": "No file selected"
         }), 400
 
-    if not allowed_file(file.filename):
+    if not allowed_file(raw_filename):
         return jsonify({
             "success": False,
             "error": "Invalid file type. Allowed types: PDF, XLSX, XLS"
@@ -113,8 +326,14 @@ def upload_document():
 
     # Get parameters
     owner = get_current_user()
-    is_public = int(request.form.get('is_public', 0))
-    filename = file.filename
+    is_public = int(raw_is_public)
+    filename = safe_filename(raw_filename)
+
+    if not filename:
+        return jsonify({
+            "success": False,
+            "error": "Invalid filename"
+        }), 400
 
     if is_public == 1 and not is_admin():
         return jsonify({
@@ -122,6 +341,15 @@ def upload_document():
             "error": "ADMIN_REQUIRED"
         }), 403
 
+    # Raw bodies skip the multipart parser: copied in 1 MiB chunks, so memory
+    # stays flat and large files spill to disk
+    if raw_upload:
+        stream = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+        shutil.copyfileobj(request.stream, stream, length=_RAW_UPLOAD_CHUNK_SIZE)
+        stream.seek(0)
+    else:
+        stream = file.stream
+
     # Determine content type based on file extension
     file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
     content_type_map = {
@@ -131,159 +359,42 @@ def upload_document():
     }
     content_type = content_type_map.get(file_ext, 'application/octet-stream')
 
-    def generate_progress():
-        """Generate SSE progress updates"""
-        # Import VectorizationProgress for per-request progress tracking
-        from document_vectorizer import VectorizationProgress
-        
-        tmp_filepath = None
-        # Create a dedicated progress instance for this upload request
-        upload_progress = VectorizationProgress()
-        
-        try:
-            # 1. Upload to MinIO + save metadata to MySQL
-            file.seek(0)
-            file_repository.upload_file(
-                username=owner,
-                filename=filename,
-                file_data=file,
-                bucket='kms',
-                content_type=content_type,
-                is_public=is_public
-            )
+    # Reject mislabeled files before anything is stored
+    if not has_valid_signature(stream, file_ext):
+        return jsonify({
+            "success": False,
+            "error": "File content does not match its extension"
+        }), 400
 
-            # 2. Download from MinIO to temporary file
-            content = file_repository.get_file(
-                username=owner,
-                filename=filename,
-                bucket='kms'
-            )
+    file_hash = content_digest(stream)
 
-            if not content:
-                raise Exception("Failed to retrieve uploaded file from MinIO")
-
-            # Create temporary file with appropriate extension
-            file_suffix = f'.{file_ext}'
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_suffix) as tmp_file:
-                tmp_file.write(content)
-                tmp_filepath = tmp_file.name
-
-            # 3. Define vectorize function to run in thread
-            def vectorize():
-                vectorizer = get_vectorizer()
-                try:
-                    logging.info(f"Starting vectorization for {filename}")
-                    # Use vectorize_file for unified document processing
-                    vectorizer.vectorize_file(
-                        tmp_filepath,
-                        owner=owner,
-                        display_filename=filename,
-                        verbose=False,
-                        progress_instance=upload_progress,  # Pass dedicated progress instance
-                        enable_summary=False  # Default: no LLM summary
-                    )
-                    logging.info(f"Vectorization completed for {filename}")
-                except Exception as e:
-                    import traceback
-                    error_details = traceback.format_exc()
-                    logging.error(f"Vectorization failed for {filename}: {e}")
-                    logging.error(f"Traceback:\n{error_details}")
-                    
-                    # Update progress with error
-                    error_message = f"向量化失败: {str(e)}"
-                    upload_progress.update(
-                        stage="error",
-                        error=error_message,
-                        message=error_message
-                    )
-                finally:
-                    # Clean up temporary file
-                    if tmp_filepath and os.path.exists(tmp_filepath):
-                        try:
-                            os.remove(tmp_filepath)
-                            logging.info(f"Cleaned up temp file: {tmp_filepath}")
-                        except Exception as e:
-                            logging.warning(f"Failed to delete temp file {tmp_filepath}: {e}")
-
-
-            # 4. Start vectorization in background thread
-            thread = threading.Thread(target=vectorize)
-            thread.start()
-
-            # 4. Poll progress and send SSE updates
-            last_page = -1
-            last_step = ""
-            timeout = 300  # 5 minutes maximum
-            start_time = time.time()
-
-            while not upload_progress.is_completed and not upload_progress.is_error:
-                # Check timeout
-                if time.time() - start_time > timeout:
-                    error_msg = {
-                        "stage": "error",
-                        "error": "处理超时，请检查文档大小或稍后重试",
-                        "progress_percent": 0
-                    }
-                    yield f"data: {json.dumps(error_msg)}\n\n"
-                    break
+    # Take a slot before the rate token, so a rejected upload costs no quota;
+    # released when the SSE response is closed
+    if not upload_slots.acquire(blocking=False):
+        return jsonify({
+            "success": False,
+            "error": "TOO_MANY_UPLOADS"
+        }), 429
 
-                # Check if thread is still alive
-                if not thread.is_alive():
-                    # Thread died without setting completion/error status
-                    if not upload_progress.is_completed and not upload_progress.is_error:
-                        error_msg = {
-                            "stage": "error",
-                            "error": "处理过程异常终止，请查看服务器日志",
-                            "progress_percent": 0
-                        }
-                        yield f"data: {json.dumps(error_msg)}\n\n"
-                        break
-
-                progress_data = upload_progress.get()
-                current_page = progress_data.get('current_page', 0)
-                current_step = progress_data.get('current_step', '')
-
-                # Send update when page changes OR step changes (to show all stages)
-                if current_page != last_page or current_step != last_step:
-                    yield f"data: {json.dumps(progress_data)}\n\n"
-                    last_page = current_page
-                    last_step = current_step
-
-                time.sleep(0.3)
-
-            # Wait for thread to complete
-            thread.join(timeout=5)
-
-            # 5. Send final result
-            if upload_progress.is_completed:
-                final_data = upload_progress.get()
-                yield f"data: {json.dumps(final_data)}\n\n"
-            elif upload_progress.is_error:
-                error_data = upload_progress.get()
-                yield f"data: {json.dumps(error_data)}\n\n"
-
-        except Exception as e:
-            error_msg = {
-                "stage": "error",
-                "error": str(e),
-                "progress_percent": 0
-            }
-            yield f"data: {json.dumps(error_msg)}\n\n"
-            # Clean up temp file on error
-            if tmp_filepath and os.path.exists(tmp_filepath):
-                try:
-                    os.remove(tmp_filepath)
-                except:
-                    pass
-
-    return Response(
-        stream_with_context(generate_progress()),
-        mimetype='text/event-stream',
-        headers={
-            'Cache-Control': 'no-cache',
-            'X-Accel-Buffering': 'no'
-        }
-    )
+    try:
+        if not check_upload_rate(owner):
+            upload_slots.release()
+            return jsonify({
+                "success": False,
+                "error": "UPLOAD_RATE_LIMITED"
+            }), 429
+
+        response = sse_response(
+            _upload_stream(stream, owner, filename, file_ext, content_type, is_public, file_hash)
+        )
+        response.call_on_close(upload_slots.release)
+    except Exception:
+        upload_slots.release()
+        raise
+
+    if raw_upload:
+        response.call_on_close(stream.close)
+    return response
 
 
 @documents_bp.route('/api/documents/<filename>', methods=['DELETE'])
@@ -298,10 +409,10 @@ def delete_document(filename):
         "success": true,
         "message": "Document deleted successfully"
     }
+
+    If only one of the vector / file deletions fails, responds 207 with
+    "error": "PARTIAL_DELETE" and "failed_steps": {"vectors"|"file": "..."}
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
     try:
         owner = get_current_user()
         
@@ -311,29 +422,45 @@ def delete_document(filename):
         except:
             pass
 
-        # 1. Delete from vector database (Qdrant)
-        try:
-            logger.info(f"Deleting from Qdrant: {filename}")
-        except:
-            pass
-        
-        vectorizer = get_vectorizer()
-        vectorizer.delete_document(filename, owner, verbose=False)
-
-        # 2. Delete file and metadata (MinIO + MySQL)
-        try:
-            logger.info(f"Deleting from MinIO and MySQL: {filename}")
-        except:
-            pass
-        result = file_repository.delete_file(
+        # Qdrant vectors and MinIO object + MySQL metadata are independent,
+        # so delete them concurrently
+        vectors_future = _io_pool.submit(
+            get_vectorizer().delete_document, filename, owner, verbose=False
+        )
+        file_future = _io_pool.submit(
+            file_repository.delete_file,
             owner=owner,
             filename=filename,
             bucket='kms'
         )
-        try:
-            logger.info(f"Delete result: {result}")
-        except:
-            pass
+        # Wait for both steps so a failure in one is reported alongside the other
+        failed_steps = {}
+        for step, future in (("vectors", vectors_future), ("file", file_future)):
+            try:
+                result = future.result()
+                logger.info(f"Delete {step} result: {result}")
+            except Exception as e:
+                logger.error(f"Delete {step} failed: {e}", exc_info=True)
+                failed_steps[step] = str(e)
+
+        if len(failed_steps) == 2:
+            return jsonify({
+                "success": False,
+                "error": "; ".join(failed_steps.values()),
+                "failed_steps": failed_steps
+            }), 500
+
+        # The deleted document may have been public, so every owner's list is stale
+        invalidate_document_list(owner, all_owners=True)
+
+        if failed_steps:
+            return jsonify({
+                "success": False,
+                "filename": filename,
+                "owner": owner,
+                "error": "PARTIAL_DELETE",
+                "failed_steps": failed_steps
+            }), 207
 
         return jsonify({
             "success": True,
@@ -375,15 +502,15 @@ def update_visibility(filename):
     }
     """
     try:
-        data = request.get_json()
-
-        if not data or 'is_public' not in data:
+        try:
+            data = parse_json_body(VisibilityRequest)
+        except msgspec.DecodeError as e:
             return jsonify({
                 "success": False,
-                "error": "Missing 'is_public' in request body"
+                "error": f"Invalid request body: {e}"
             }), 400
 
-        is_public = int(data['is_public'])
+        is_public = data.is_public
 
         if is_public not in [0, 1]:
             return jsonify({
@@ -407,6 +534,7 @@ def update_visibility(filename):
         )
 
         if success:
+            invalidate_document_list(owner, all_owners=True)
             return jsonify({
                 "success": True,
                 "filename": filename,
@@ -440,27 +568,58 @@ def get_document_content(filename):
     try:
         owner = get_current_user()
 
-        # Get file from MinIO
-        content = file_repository.get_file(
+        file_ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        content_type_map = {
+            'pdf': 'application/pdf',
+            'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            'xls': 'application/vnd.ms-excel'
+        }
+        mime = content_type_map.get(file_ext, 'application/octet-stream')
+
+        # Let the client fetch the object from MinIO directly
+        if config.DOCUMENT_CONTENT_REDIRECT:
+            url = file_repository.get_presigned_url(
+                username=owner,
+                filename=filename,
+                bucket='kms',
+                expires=config.PRESIGNED_URL_EXPIRES,
+                content_type=mime
+            )
+            return redirect(url, code=302)
+
+        # Stream file from MinIO (Range and conditional headers are forwarded,
+        # so MinIO answers unchanged objects without sending the body)
+        obj = file_repository.get_file_stream(
             username=owner,
             filename=filename,
-            bucket='kms'
+            bucket='kms',
+            byte_range=request.headers.get('Range'),
+            if_none_match=request.headers.get('If-None-Match'),
+            if_modified_since=request.if_modified_since
         )
 
-        if content:
-            file_ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
-            content_type_map = {
-                'pdf': 'application/pdf',
-                'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                'xls': 'application/vnd.ms-excel'
-            }
-            mime = content_type_map.get(file_ext, 'application/octet-stream')
-            return send_file(
-                BytesIO(content),
+        if obj and obj['not_modified']:
+            response = Response(status=304)
+            _set_validators(response, obj)
+            return response
+        elif obj:
+            # The MinIO body has no fileno(), so the server cannot sendfile() it;
+            # relay it in large chunks instead of send_file's 8 KiB reads
+            body = obj['body']
+            response = Response(
+                body.iter_chunks(_CONTENT_CHUNK_SIZE),
                 mimetype=mime,
-                as_attachment=False,
-                download_name=filename
+                direct_passthrough=True
             )
+            response.call_on_close(body.close)
+            _set_inline_disposition(response, filename)
+            response.content_length = obj['content_length']
+            response.headers['Accept-Ranges'] = 'bytes'
+            _set_validators(response, obj)
+            if obj['content_range']:
+                response.status_code = 206
+                response.headers['Content-Range'] = obj['content_range']
+            return response
         else:
             return jsonify({
                 "success": False,
@@ -9,7 +9,9 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "services": {
-            "km_agent": agent_service.km_agent is not None,
+            # Agents are built on demand from the shared vectorizer
+            "km_agent": agent_service.vectorizer is not None,
+            "km_agent_cache_size": len(agent_service.km_agent_cache),
             "vectorizer": agent_service.vectorizer is not None
         }
     })
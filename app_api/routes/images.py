@@ -1,7 +1,5 @@
-import os
-import tempfile
 from flask import Blueprint, request, jsonify
-from app_api.services.validators import allowed_image
+from app_api.services.validators import allowed_image, safe_filename
 from ks_infrastructure import get_current_user
 from tmp_image_repository import analyze_temp_image
 
@@ -32,14 +30,15 @@ def analyze_image():
         }), 400
 
     file = request.files['file']
+    filename = safe_filename(file.filename)
 
-    if file.filename == '':
+    if filename == '':
         return jsonify({
             "success": False,
             "error": "No file selected"
         }), 400
 
-    if not allowed_image(file.filename):
+    if not allowed_image(filename):
         return jsonify({
             "success": False,
             "error": "Invalid file type. Allowed types: png, jpg, jpeg, gif, bmp, webp"
@@ -50,32 +49,19 @@ def analyze_image():
     prompt = request.form.get('prompt', None)
 
     try:
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-            file.save(tmp_file.name)
-            tmp_filepath = tmp_file.name
+        # The analyzer needs the whole image in memory (for base64), so hand it
+        # the uploaded bytes directly instead of round-tripping via a temp file
+        kwargs = {
+            'image_data': file.read(),
+            'username': username,
+            'custom_filename': filename
+        }
+        if prompt:
+            kwargs['prompt'] = prompt
 
-        try:
-            # Analyze image
-            kwargs = {
-                'image_path': tmp_filepath,
-                'username': username,
-                'custom_filename': file.filename
-            }
-            if prompt:
-                kwargs['prompt'] = prompt
+        result = analyze_temp_image(**kwargs)
 
-            result = analyze_temp_image(**kwargs)
-
-            return jsonify(result)
-
-        finally:
-            # Clean up temporary file
-            if os.path.exists(tmp_filepath):
-                try:
-                    os.remove(tmp_filepath)
-                except Exception as e:
-                    print(f"Warning: Failed to delete temp file {tmp_filepath}: {e}")
+        return jsonify(result)
 
     except Exception as e:
         return jsonify({
@@ -1,4 +1,5 @@
-from flask import Blueprint, request, jsonify
+import logging
+from flask import Blueprint, Response, request, jsonify
 from ks_infrastructure import get_current_user, is_admin
 from instruction_repository import (
     create_instruction,
@@ -7,8 +8,18 @@ from instruction_repository import (
     update_instruction,
     delete_instruction
 )
+from app_api.services.error_handlers import register_json_error_handlers
+from app_api.services.validators import get_json_body
+from app_api.services.instruction_cache import (
+    get_cached_instruction_list,
+    set_cached_instruction_list,
+    invalidate_instructions
+)
+
+logger = logging.getLogger(__name__)
 
 instructions_bp = Blueprint('instructions', __name__)
+register_json_error_handlers(instructions_bp)
 
 @instructions_bp.route('/api/instructions', methods=['POST'])
 def create_user_instruction():
@@ -29,29 +40,24 @@ def create_user_instruction():
         "message": "指示创建成功"
     }
     """
-    try:
-        data = request.json
-        owner = get_current_user()
-        print(f"[DEBUG] create_user_instruction: Using owner {owner}", flush=True)
-
-        content = data.get('content')
-        priority = data.get('priority', 0)
-        is_public = bool(data.get('is_public', False))
-
-        if is_public and not is_admin():
-            return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
-        
-        if not content:
-            return jsonify({"success": False, "error": "content参数不能为空"}), 400
-        
-        result = create_instruction(owner, content, priority, is_public)
-        result['message'] = "指示创建成功"
-        return jsonify(result), 201
-        
-    except ValueError as e:
-        return jsonify({"success": False, "error": str(e)}), 400
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    data = get_json_body() or {}
+    owner = get_current_user()
+    logger.debug("create_user_instruction: Using owner %s", owner)
+
+    content = data.get('content')
+    priority = data.get('priority', 0)
+    is_public = bool(data.get('is_public', False))
+
+    if is_public and not is_admin():
+        return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
+    
+    if not content:
+        return jsonify({"success": False, "error": "content参数不能为空"}), 400
+    
+    result = create_instruction(owner, content, priority, is_public)
+    invalidate_instructions(owner, all_owners=bool(is_public))
+    result['message'] = "指示创建成功"
+    return jsonify(result), 201
 
 
 @instructions_bp.route('/api/instructions', methods=['GET'])
@@ -69,24 +75,24 @@ def get_user_instructions():
         "instructions": [...]
     }
     """
-    try:
-        owner = get_current_user()
-        print(f"[DEBUG] get_user_instructions: Using owner {owner}", flush=True)
-
-        include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
-        
-        print(f"[DEBUG] Getting instructions for owner: {owner}", flush=True)
-        
-        instructions = get_all_instructions(owner, include_inactive)
-        for item in instructions:
-            item['is_editable'] = (item.get('owner') == owner)
-        return jsonify({
-            "success": True,
-            "instructions": instructions
-        })
-        
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    owner = get_current_user()
+    logger.debug("get_user_instructions: Using owner %s", owner)
+
+    include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
+
+    cached = get_cached_instruction_list(owner, include_inactive)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+    
+    instructions = get_all_instructions(owner, include_inactive)
+    for item in instructions:
+        item['is_editable'] = (item.get('owner') == owner)
+    response = jsonify({
+        "success": True,
+        "instructions": instructions
+    })
+    set_cached_instruction_list(owner, include_inactive, response.get_data())
+    return response
 
 
 @instructions_bp.route('/api/instructions/<int:instruction_id>', methods=['GET'])
@@ -110,20 +116,14 @@ def get_instruction_detail(instruction_id):
         }
     }
     """
-    try:
-        owner = get_current_user()
-        
-        instruction = get_instruction_by_id(instruction_id, owner)
-        instruction['is_editable'] = (instruction.get('owner') == owner)
-        return jsonify({
-            "success": True,
-            "instruction": instruction
-        })
-        
-    except ValueError as e:
-        return jsonify({"success": False, "error": str(e)}), 404
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    owner = get_current_user()
+    
+    instruction = get_instruction_by_id(instruction_id, owner)
+    instruction['is_editable'] = (instruction.get('owner') == owner)
+    return jsonify({
+        "success": True,
+        "instruction": instruction
+    })
 
 
 @instructions_bp.route('/api/instructions/<int:instruction_id>', methods=['PUT'])
@@ -145,31 +145,27 @@ def update_user_instruction(instruction_id):
         "message": "指示更新成功"
     }
     """
-    try:
-        data = request.json
-        owner = get_current_user()
-        
-        content = data.get('content')
-        is_active = data.get('is_active')
-        priority = data.get('priority')
-        is_public = data.get('is_public')
-        if is_public is not None:
-            is_public = bool(is_public)
-
-        if is_public and not is_admin():
-            return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
-        
-        update_instruction(instruction_id, owner, content, is_active, priority, is_public)
-        
-        return jsonify({
-            "success": True,
-            "message": "指示更新成功"
-        })
-        
-    except ValueError as e:
-        return jsonify({"success": False, "error": str(e)}), 404
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    data = get_json_body() or {}
+    owner = get_current_user()
+    
+    content = data.get('content')
+    is_active = data.get('is_active')
+    priority = data.get('priority')
+    is_public = data.get('is_public')
+    if is_public is not None:
+        is_public = bool(is_public)
+
+    if is_public and not is_admin():
+        return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
+    
+    update_instruction(instruction_id, owner, content, is_active, priority, is_public)
+    # The instruction may be (or have been) public
+    invalidate_instructions(owner, all_owners=True)
+    
+    return jsonify({
+        "success": True,
+        "message": "指示更新成功"
+    })
 
 
 @instructions_bp.route('/api/instructions/<int:instruction_id>', methods=['DELETE'])
@@ -188,17 +184,13 @@ def delete_user_instruction(instruction_id):
         "message": "指示删除成功"
     }
     """
-    try:
-        owner = get_current_user()
-        
-        delete_instruction(instruction_id, owner)
-        
-        return jsonify({
-            "success": True,
-            "message": "指示删除成功"
-        })
-        
-    except ValueError as e:
-        return jsonify({"success": False, "error": str(e)}), 404
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    owner = get_current_user()
+    
+    delete_instruction(instruction_id, owner)
+    # The instruction may have been public
+    invalidate_instructions(owner, all_owners=True)
+    
+    return jsonify({
+        "success": True,
+        "message": "指示删除成功"
+    })
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from ks_infrastructure import get_current_user, is_admin
 from quote_repository.db import (
     create_quote,
@@ -6,8 +6,16 @@ from quote_repository.db import (
     update_quote,
     delete_quote
 )
+from app_api.services.error_handlers import register_json_error_handlers
+from app_api.services.validators import get_json_body
+from app_api.services.quote_cache import (
+    get_cached_quote_page,
+    set_cached_quote_page,
+    invalidate_quote_pages
+)
 
 quotes_bp = Blueprint('quotes', __name__)
+register_json_error_handlers(quotes_bp)
 
 @quotes_bp.route('/api/quotes', methods=['POST'])
 def create_new_quote():
@@ -28,27 +36,22 @@ def create_new_quote():
         "is_fixed": 0
     }
     """
-    try:
-        # Ensure user is logged in
-        get_current_user()
+    # Ensure user is logged in
+    get_current_user()
 
-        if not is_admin():
-            return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
-        
-        data = request.json
-        content = data.get('content')
-        is_fixed = data.get('is_fixed', 0)
-        
-        if not content:
-            return jsonify({"success": False, "error": "content参数不能为空"}), 400
-        
-        result = create_quote(content, is_fixed)
-        return jsonify(result)
-        
-    except ValueError as e:
-        return jsonify({"success": False, "error": str(e)}), 400
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    if not is_admin():
+        return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
+    
+    data = get_json_body() or {}
+    content = data.get('content')
+    is_fixed = data.get('is_fixed', 0)
+    
+    if not content:
+        return jsonify({"success": False, "error": "content参数不能为空"}), 400
+    
+    result = create_quote(content, is_fixed)
+    invalidate_quote_pages()
+    return jsonify(result)
 
 
 @quotes_bp.route('/api/quotes', methods=['GET'])
@@ -69,18 +72,20 @@ def get_quote_list():
         "total_pages": 10
     }
     """
-    try:
-        # Ensure user is logged in
-        get_current_user()
-        
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('page_size', 10))
-        
-        result = get_quotes(page, page_size)
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    # Ensure user is logged in
+    get_current_user()
+    
+    page = int(request.args.get('page', 1))
+    page_size = int(request.args.get('page_size', 10))
+    
+    cached = get_cached_quote_page(page, page_size)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+
+    result = get_quotes(page, page_size)
+    response = jsonify(result)
+    set_cached_quote_page(page, page_size, response.get_data())
+    return response
 
 
 @quotes_bp.route('/api/quotes/<int:quote_id>', methods=['PUT'])
@@ -100,24 +105,19 @@ def update_existing_quote(quote_id):
         "message": "Quote updated successfully"
     }
     """
-    try:
-        # Ensure user is logged in
-        get_current_user()
+    # Ensure user is logged in
+    get_current_user()
 
-        if not is_admin():
-            return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
-        
-        data = request.json
-        content = data.get('content')
-        is_fixed = data.get('is_fixed')
-        
-        result = update_quote(quote_id, content, is_fixed)
-        return jsonify(result)
-        
-    except ValueError as e:
-        return jsonify({"success": False, "error": str(e)}), 404
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    if not is_admin():
+        return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
+    
+    data = get_json_body() or {}
+    content = data.get('content')
+    is_fixed = data.get('is_fixed')
+    
+    result = update_quote(quote_id, content, is_fixed)
+    invalidate_quote_pages()
+    return jsonify(result)
 
 
 @quotes_bp.route('/api/quotes/<int:quote_id>', methods=['DELETE'])
@@ -131,17 +131,12 @@ def delete_existing_quote(quote_id):
         "message": "Quote deleted successfully"
     }
     """
-    try:
-        # Ensure user is logged in
-        get_current_user()
+    # Ensure user is logged in
+    get_current_user()
 
-        if not is_admin():
-            return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
-        
-        result = delete_quote(quote_id)
-        return jsonify(result)
-        
-    except ValueError as e:
-        return jsonify({"success": False, "error": str(e)}), 404
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    if not is_admin():
+        return jsonify({"success": False, "error": "ADMIN_REQUIRED"}), 403
+    
+    result = delete_quote(quote_id)
+    invalidate_quote_pages()
+    return jsonify(result)
@@ -4,14 +4,19 @@ Reminders API Routes - 提醒管理接口
 提供全局提醒的增删改查功能
 """
 
-import logging
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, jsonify
 from reminder_repository import db as reminder_repository
 from ks_infrastructure import get_current_user, is_admin
-
-logger = logging.getLogger(__name__)
+from app_api.services.error_handlers import register_json_error_handlers
+from app_api.services.validators import get_json_body
+from app_api.services.reminder_cache import (
+    get_cached_reminder_list,
+    set_cached_reminder_list,
+    invalidate_reminder_list
+)
 
 reminders_bp = Blueprint('reminders', __name__, url_prefix='/api/reminders')
+register_json_error_handlers(reminders_bp)
 
 
 @reminders_bp.route('', methods=['GET'])
@@ -36,20 +41,20 @@ def get_reminders():
             ]
         }
     """
-    try:
-        # 自动获取当前用户
-        current_user = get_current_user()
-        reminders = reminder_repository.get_all_reminders(user_id=current_user)
-        return jsonify({
-            'success': True,
-            'data': reminders
-        })
-    except Exception as e:
-        logger.error(f"Failed to get reminders: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    # 自动获取当前用户
+    current_user = get_current_user()
+
+    cached = get_cached_reminder_list(current_user)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+
+    reminders = reminder_repository.get_all_reminders(user_id=current_user)
+    response = jsonify({
+        'success': True,
+        'data': reminders
+    })
+    set_cached_reminder_list(current_user, response.get_data())
+    return response
 
 
 @reminders_bp.route('', methods=['POST'])
@@ -69,44 +74,32 @@ def create_reminder():
             "reminder_id": 1
         }
     """
-    try:
-        data = request.get_json()
-        
-        if not data or 'content' not in data:
-            return jsonify({
-                'success': False,
-                'error': '缺少必需参数: content'
-            }), 400
-        
-        is_public = data.get('is_public', False)
-        if is_public and not is_admin():
-            return jsonify({
-                'success': False,
-                'error': 'ADMIN_REQUIRED'
-            }), 403
-        
-        # 自动获取当前用户（私有提醒时使用）
-        current_user = get_current_user() if not is_public else None
-        
-        result = reminder_repository.create_reminder(
-            content=data['content'],
-            is_public=is_public,
-            user_id=current_user
-        )
-        
-        return jsonify(result), 201
-    except ValueError as e:
-        logger.warning(f"Invalid reminder data: {e}")
+    data = get_json_body()
+    
+    if not data or 'content' not in data:
         return jsonify({
             'success': False,
-            'error': str(e)
+            'error': '缺少必需参数: content'
         }), 400
-    except Exception as e:
-        logger.error(f"Failed to create reminder: {e}")
+    
+    is_public = data.get('is_public', False)
+    if is_public and not is_admin():
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'ADMIN_REQUIRED'
+        }), 403
+    
+    # 自动获取当前用户（私有提醒时使用）
+    current_user = get_current_user() if not is_public else None
+    
+    result = reminder_repository.create_reminder(
+        content=data['content'],
+        is_public=is_public,
+        user_id=current_user
+    )
+    invalidate_reminder_list(current_user, all_users=bool(is_public))
+    
+    return jsonify(result), 201
 
 
 @reminders_bp.route('/<int:reminder_id>', methods=['GET'])
@@ -125,23 +118,11 @@ def get_reminder(reminder_id):
             }
         }
     """
-    try:
-        reminder = reminder_repository.get_reminder_by_id(reminder_id)
-        return jsonify({
-            'success': True,
-            'data': reminder
-        })
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 404
-    except Exception as e:
-        logger.error(f"Failed to get reminder {reminder_id}: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    reminder = reminder_repository.get_reminder_by_id(reminder_id)
+    return jsonify({
+        'success': True,
+        'data': reminder
+    })
 
 
 @reminders_bp.route('/<int:reminder_id>', methods=['PUT'])
@@ -161,46 +142,35 @@ def update_reminder(reminder_id):
             "message": "提醒更新成功"
         }
     """
-    try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'success': False,
-                'error': '请求体不能为空'
-            }), 400
-        
-        content = data.get('content')
-        is_public = data.get('is_public')
-        if is_public and not is_admin():
-            return jsonify({
-                'success': False,
-                'error': 'ADMIN_REQUIRED'
-            }), 403
-        
-        # 自动获取当前用户（切换为私有时使用）
-        current_user = get_current_user() if is_public is False else None
-        
-        result = reminder_repository.update_reminder(
-            reminder_id=reminder_id,
-            content=content,
-            is_public=is_public,
-            user_id=current_user
-        )
-        
-        return jsonify(result)
-    except ValueError as e:
-        logger.warning(f"Invalid reminder update: {e}")
+    data = get_json_body()
+    
+    if not data:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 404
-    except Exception as e:
-        logger.error(f"Failed to update reminder {reminder_id}: {e}")
+            'error': '请求体不能为空'
+        }), 400
+    
+    content = data.get('content')
+    is_public = data.get('is_public')
+    if is_public and not is_admin():
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'ADMIN_REQUIRED'
+        }), 403
+    
+    # 自动获取当前用户（切换为私有时使用）
+    current_user = get_current_user() if is_public is False else None
+    
+    result = reminder_repository.update_reminder(
+        reminder_id=reminder_id,
+        content=content,
+        is_public=is_public,
+        user_id=current_user
+    )
+    # The reminder's previous owner/visibility is unknown here
+    invalidate_reminder_list(None, all_users=True)
+    
+    return jsonify(result)
 
 
 @reminders_bp.route('/<int:reminder_id>', methods=['DELETE'])
@@ -214,17 +184,6 @@ def delete_reminder(reminder_id):
             "message": "提醒删除成功"
         }
     """
-    try:
-        result = reminder_repository.delete_reminder(reminder_id)
-        return jsonify(result)
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 404
-    except Exception as e:
-        logger.error(f"Failed to delete reminder {reminder_id}: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    result = reminder_repository.delete_reminder(reminder_id)
+    invalidate_reminder_list(None, all_users=True)
+    return jsonify(result)
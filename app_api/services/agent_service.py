@@ -1,49 +1,91 @@
+import time
+import threading
+from collections import OrderedDict
 from km_agent import KMAgent
 from document_vectorizer import PDFVectorizer
+from app_api import config
 
-# Global instances
-km_agent = None
+# Shared vectorizer (agents are created per owner by acquire_km_agent)
 vectorizer = None
 
+# KMAgent instances keyed by (owner, conversation_id), least recently used first.
+# Values are (agent, lock, created_at); entries expire after KM_AGENT_CACHE_TTL.
+# An agent holds per-chat state (instructions, history), so its lock is held
+# for the whole chat call that uses it.
+km_agent_cache = OrderedDict()
+_km_agent_cache_lock = threading.Lock()
+_vectorizer_lock = threading.Lock()
 
-def get_or_create_km_agent(owner: str, conversation_id: str = None, enable_history: bool = False):
+
+def _cache_get(key):
+    with _km_agent_cache_lock:
+        entry = km_agent_cache.get(key)
+        if entry is None:
+            return None
+        agent, lock, created_at = entry
+        if time.monotonic() - created_at > config.KM_AGENT_CACHE_TTL:
+            del km_agent_cache[key]
+            return None
+        km_agent_cache.move_to_end(key)
+        return agent, lock
+
+
+def _cache_put(key, agent, lock):
+    with _km_agent_cache_lock:
+        km_agent_cache[key] = (agent, lock, time.monotonic())
+        km_agent_cache.move_to_end(key)
+        while len(km_agent_cache) > config.KM_AGENT_CACHE_SIZE:
+            km_agent_cache.popitem(last=False)
+
+
+def acquire_km_agent(owner: str, conversation_id: str = None, enable_history: bool = False):
     """
-    Get or create KMAgent instance for specific owner
+    Get or create the KMAgent for a chat call and lock it for that call
     
     Args:
         owner: User identifier
         conversation_id: Conversation ID for history persistence (optional)
         enable_history: Whether to enable conversation history persistence
     
+    Returns:
+        (agent, release): release() must be called once the chat call,
+        including its response stream, is over
+    
     Note:
-        When enable_history is True, a new KMAgent instance is created each time
-        to ensure conversation isolation. Otherwise, instances are cached.
+        Instances are cached per owner (and per conversation when history is
+        enabled) in a bounded LRU with TTL. A request with history enabled but
+        no conversation_id starts a new conversation and gets a new instance.
+        Concurrent calls for the same key wait for each other instead of
+        interleaving their state on the shared instance.
     """
-    global vectorizer
-    
-    # Ensure vectorizer is initialized
-    if vectorizer is None:
-        vectorizer = PDFVectorizer()
-    
-    # Always create a new KMAgent instance to ensure thread safety and isolation
+    key = (owner, conversation_id if enable_history else None)
+    if key[1] is not None or not enable_history:
+        entry = _cache_get(key)
+        if entry is not None:
+            agent, lock = entry
+            lock.acquire()
+            return agent, lock.release
+
     # We pass the shared vectorizer to avoid re-initialization overhead
-    return KMAgent(
+    agent = KMAgent(
         verbose=True,
         owner=owner,
         conversation_id=conversation_id,
         enable_history=enable_history,
-        vectorizer=vectorizer
+        vectorizer=get_vectorizer()
     )
+    lock = threading.Lock()
+    lock.acquire()
 
-def init_services():
-    """Initialize KM Agent and PDF Vectorizer"""
-    global km_agent, vectorizer
-
-    # Initialize KM Agent (uses ks_infrastructure, no parameters needed)
-    km_agent = KMAgent(verbose=True)
+    if enable_history:
+        # Later turns of a new conversation arrive with its generated id
+        key = (owner, agent.conversation_manager.get_conversation_id())
+    _cache_put(key, agent, lock)
+    return agent, lock.release
 
-    # Initialize PDF Vectorizer (uses ks_infrastructure, defaults from pdf_vectorizer)
-    vectorizer = PDFVectorizer()
+def init_services():
+    """Initialize the shared PDF Vectorizer (idempotent)"""
+    get_vectorizer()
 
     print("✓ Services initialized successfully")
 
@@ -51,5 +93,8 @@ def get_vectorizer():
     """Get the global vectorizer instance"""
     global vectorizer
     if vectorizer is None:
-        vectorizer = PDFVectorizer()
+        # Concurrent first requests must not each build a vectorizer
+        with _vectorizer_lock:
+            if vectorizer is None:
+                vectorizer = PDFVectorizer()
     return vectorizer
@@ -0,0 +1,51 @@
+"""
+Redis cache for conversation ownership
+
+Most conversation routes look a conversation up only to check its owner. The
+owner of a conversation never changes, so it is cached per conversation_id with
+a short TTL and dropped when the conversation is deleted. Redis errors never
+fail the request; they only degrade to a database read.
+"""
+
+import logging
+from typing import Optional
+from conversation_repository import get_conversation
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_OWNER_TTL = 60  # seconds
+_KEY_PREFIX = "conv_owner:"
+
+
+def _key(conversation_id: str) -> str:
+    return f"{_KEY_PREFIX}{conversation_id}"
+
+
+def get_conversation_owner(conversation_id: str) -> Optional[str]:
+    """Return the owner of a conversation, or None if it does not exist"""
+    try:
+        cached = ks_redis().get(_key(conversation_id))
+        if cached is not None:
+            return cached
+    except Exception as e:
+        logger.warning(f"Conversation owner cache read failed: {e}")
+
+    conversation = get_conversation(conversation_id)
+    if not conversation:
+        return None
+
+    owner = conversation['owner']
+    try:
+        ks_redis().setex(_key(conversation_id), CONVERSATION_OWNER_TTL, owner)
+    except Exception as e:
+        logger.warning(f"Conversation owner cache write failed: {e}")
+    return owner
+
+
+def invalidate_conversation_owner(conversation_id: str) -> None:
+    """Drop the cached owner of a deleted conversation"""
+    try:
+        ks_redis().delete(_key(conversation_id))
+    except Exception as e:
+        logger.warning(f"Conversation owner cache invalidation failed: {e}")
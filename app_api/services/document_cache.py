@@ -0,0 +1,59 @@
+"""
+Redis cache for per-owner document lists
+
+The document list only changes on upload/delete/visibility updates, so the
+serialized /api/documents response is cached per owner and invalidated
+explicitly by those handlers. Redis errors never fail the request; they only
+degrade to a cache miss.
+"""
+
+import logging
+from typing import Optional
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_LIST_TTL = 300  # seconds
+_KEY_PREFIX = "doclist:"
+
+
+def _key(owner: str) -> str:
+    return f"{_KEY_PREFIX}{owner}"
+
+
+def get_cached_document_list(owner: str) -> Optional[str]:
+    """Return the cached JSON body for owner, or None on miss"""
+    try:
+        return ks_redis().get(_key(owner))
+    except Exception as e:
+        logger.warning(f"Document list cache read failed: {e}")
+        return None
+
+
+def set_cached_document_list(owner: str, body: bytes) -> None:
+    """Cache the JSON body for owner"""
+    try:
+        ks_redis().setex(_key(owner), DOCUMENT_LIST_TTL, body)
+    except Exception as e:
+        logger.warning(f"Document list cache write failed: {e}")
+
+
+def invalidate_document_list(owner: str, all_owners: bool = False) -> None:
+    """
+    Drop cached document lists
+
+    Args:
+        owner: Owner whose list changed
+        all_owners: Also drop every other owner's list (needed when a public
+                    document changes, since public documents appear in all lists)
+    """
+    try:
+        client = ks_redis()
+        if all_owners:
+            keys = list(client.scan_iter(match=f"{_KEY_PREFIX}*", count=500))
+            if keys:
+                client.delete(*keys)
+        else:
+            client.delete(_key(owner))
+    except Exception as e:
+        logger.warning(f"Document list cache invalidation failed: {e}")
@@ -0,0 +1,45 @@
+"""
+Blueprint-level JSON error handlers
+
+The CRUD blueprints (instructions, quotes, reminders) answer failures with
+{"success": false, "error": str(e)}. Registering that once per blueprint keeps
+the route bodies straight-line instead of wrapping each in try/except.
+"""
+
+import logging
+from flask import Blueprint, request, jsonify
+from werkzeug.exceptions import HTTPException
+from ks_infrastructure.services.exceptions import KsNotFoundError
+
+
+def register_json_error_handlers(bp: Blueprint) -> None:
+    """
+    Map exceptions raised by bp's routes to JSON error responses
+
+    KsNotFoundError (raised by the repositories for missing rows) becomes 404
+    and any other ValueError (invalid input) becomes 400. HTTP errors keep
+    their own status (413 gets a JSON body, overriding the app's
+    file-size message); anything else is logged and becomes 500.
+    """
+    logger = logging.getLogger(bp.import_name)
+
+    @bp.errorhandler(413)
+    def handle_too_large(e):
+        return jsonify({"success": False, "error": "REQUEST_TOO_LARGE"}), 413
+
+    @bp.errorhandler(KsNotFoundError)
+    def handle_not_found(e):
+        logger.warning("%s %s: %s", request.method, request.path, e)
+        return jsonify({"success": False, "error": str(e)}), 404
+
+    @bp.errorhandler(ValueError)
+    def handle_value_error(e):
+        logger.warning("%s %s: %s", request.method, request.path, e)
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    @bp.errorhandler(Exception)
+    def handle_exception(e):
+        if isinstance(e, HTTPException):
+            return e
+        logger.error("%s %s failed: %s", request.method, request.path, e, exc_info=e)
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,90 @@
+"""
+Redis cache for per-owner active instructions
+
+Every chat request needs the owner's active instructions to build the system
+prompt. They are cached per owner with a short TTL and invalidated explicitly
+by the instruction create/update/delete handlers. The serialized
+/api/instructions response is cached alongside and dropped by the same
+invalidation. Redis errors never fail the request; they only degrade to a
+database read.
+"""
+
+import logging
+from typing import Optional
+import orjson
+from instruction_repository import get_active_instructions
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
+
+INSTRUCTIONS_TTL = 60  # seconds
+_KEY_PREFIX = "instructions:"
+_LIST_KEY_PREFIX = "instruction_list:"
+
+
+def _key(owner: str) -> str:
+    return f"{_KEY_PREFIX}{owner}"
+
+
+def _list_keys(owner: str) -> list:
+    return [f"{_LIST_KEY_PREFIX}{owner}:{int(flag)}" for flag in (False, True)]
+
+
+def get_cached_instructions(owner: str) -> list:
+    """Return the owner's active instructions, reading through the cache"""
+    try:
+        cached = ks_redis().get(_key(owner))
+        if cached is not None:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"Instructions cache read failed: {e}")
+
+    instructions = get_active_instructions(owner)
+
+    try:
+        ks_redis().setex(_key(owner), INSTRUCTIONS_TTL, orjson.dumps(instructions))
+    except Exception as e:
+        logger.warning(f"Instructions cache write failed: {e}")
+    return instructions
+
+
+def get_cached_instruction_list(owner: str, include_inactive: bool) -> Optional[str]:
+    """Return the cached /api/instructions JSON body, or None on miss"""
+    try:
+        return ks_redis().get(_list_keys(owner)[include_inactive])
+    except Exception as e:
+        logger.warning(f"Instruction list cache read failed: {e}")
+        return None
+
+
+def set_cached_instruction_list(owner: str, include_inactive: bool, body: bytes) -> None:
+    """Cache the /api/instructions JSON body"""
+    try:
+        ks_redis().setex(_list_keys(owner)[include_inactive], INSTRUCTIONS_TTL, body)
+    except Exception as e:
+        logger.warning(f"Instruction list cache write failed: {e}")
+
+
+def invalidate_instructions(owner: str, all_owners: bool = False) -> None:
+    """
+    Drop cached instructions
+
+    Args:
+        owner: Owner whose instructions changed
+        all_owners: Also drop every other owner's entry (needed when a public
+                    instruction may have changed, since those apply to everyone)
+    """
+    try:
+        client = ks_redis()
+        if all_owners:
+            keys = [
+                key
+                for prefix in (_KEY_PREFIX, _LIST_KEY_PREFIX)
+                for key in client.scan_iter(match=f"{prefix}*", count=500)
+            ]
+            if keys:
+                client.delete(*keys)
+        else:
+            client.delete(_key(owner), *_list_keys(owner))
+    except Exception as e:
+        logger.warning(f"Instructions cache invalidation failed: {e}")
@@ -0,0 +1,34 @@
+"""
+orjson-backed JSON provider for Flask
+
+Replaces the stdlib json used by request.get_json()/jsonify with orjson while
+keeping Flask's serialization of dates (RFC 822), Decimal, UUID and dataclasses.
+jsonify responses are built from orjson's bytes directly and are always
+compact, also in debug mode.
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+_DUMPS_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        """Serialize data as JSON to a string"""
+        option = _DUMPS_OPTIONS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON from a string or bytes"""
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response from orjson bytes (no str round trip, no indent)"""
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=_DUMPS_OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,51 @@
+"""
+Non-blocking logging for App API
+
+Request threads only enqueue log records; a QueueListener thread formats them
+and writes them to stderr, so stream I/O never happens on the request path.
+Listener threads do not survive fork, so gunicorn workers call
+start_log_listener() again in post_fork.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+LOG_FORMAT = '%(asctime)s - [%(name)s] %(levelname)s - %(message)s'
+
+_log_queue = queue.SimpleQueue()
+_stream_handler = None
+_listener = None
+
+
+def configure_logging(level: str = 'INFO') -> None:
+    """Route all root logger output through the queue and start the listener"""
+    global _stream_handler
+
+    _stream_handler = logging.StreamHandler()
+    _stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    root.handlers[:] = [logging.handlers.QueueHandler(_log_queue)]
+
+    start_log_listener()
+    atexit.register(stop_log_listener)
+
+
+def start_log_listener() -> None:
+    """Start the thread draining the log queue (again, after fork)"""
+    global _listener
+    if _stream_handler is None:
+        return
+    _listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+    _listener.start()
+
+
+def stop_log_listener() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,49 @@
+"""
+Redis cache for quote list pages
+
+Quotes are shared by all users and only change through the admin
+create/update/delete handlers, so each serialized /api/quotes page is cached
+by (page, page_size) and all pages are dropped on any change. Redis errors
+never fail the request; they only degrade to a cache miss.
+"""
+
+import logging
+from typing import Optional
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
+
+QUOTE_LIST_TTL = 300  # seconds
+_KEY_PREFIX = "quotes:"
+
+
+def _key(page: int, page_size: int) -> str:
+    return f"{_KEY_PREFIX}{page}:{page_size}"
+
+
+def get_cached_quote_page(page: int, page_size: int) -> Optional[str]:
+    """Return the cached JSON body for a page, or None on miss"""
+    try:
+        return ks_redis().get(_key(page, page_size))
+    except Exception as e:
+        logger.warning(f"Quote list cache read failed: {e}")
+        return None
+
+
+def set_cached_quote_page(page: int, page_size: int, body: bytes) -> None:
+    """Cache the JSON body for a page"""
+    try:
+        ks_redis().setex(_key(page, page_size), QUOTE_LIST_TTL, body)
+    except Exception as e:
+        logger.warning(f"Quote list cache write failed: {e}")
+
+
+def invalidate_quote_pages() -> None:
+    """Drop every cached quote page"""
+    try:
+        client = ks_redis()
+        keys = list(client.scan_iter(match=f"{_KEY_PREFIX}*", count=500))
+        if keys:
+            client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Quote list cache invalidation failed: {e}")
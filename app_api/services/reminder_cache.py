@@ -0,0 +1,59 @@
+"""
+Redis cache for per-user reminder lists
+
+The reminder list only changes through the reminder create/update/delete
+handlers, so the serialized /api/reminders response is cached per user and
+invalidated explicitly by those handlers. Redis errors never fail the request;
+they only degrade to a cache miss.
+"""
+
+import logging
+from typing import Optional
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LIST_TTL = 60  # seconds
+_KEY_PREFIX = "reminders:"
+
+
+def _key(user_id: str) -> str:
+    return f"{_KEY_PREFIX}{user_id}"
+
+
+def get_cached_reminder_list(user_id: str) -> Optional[str]:
+    """Return the cached JSON body for user_id, or None on miss"""
+    try:
+        return ks_redis().get(_key(user_id))
+    except Exception as e:
+        logger.warning(f"Reminder list cache read failed: {e}")
+        return None
+
+
+def set_cached_reminder_list(user_id: str, body: bytes) -> None:
+    """Cache the JSON body for user_id"""
+    try:
+        ks_redis().setex(_key(user_id), REMINDER_LIST_TTL, body)
+    except Exception as e:
+        logger.warning(f"Reminder list cache write failed: {e}")
+
+
+def invalidate_reminder_list(user_id: Optional[str], all_users: bool = False) -> None:
+    """
+    Drop cached reminder lists
+
+    Args:
+        user_id: User whose list changed
+        all_users: Also drop every other user's list (needed when a public
+                   reminder changes, or when the reminder's owner is unknown)
+    """
+    try:
+        client = ks_redis()
+        if all_users or not user_id:
+            keys = list(client.scan_iter(match=f"{_KEY_PREFIX}*", count=500))
+            if keys:
+                client.delete(*keys)
+        else:
+            client.delete(_key(user_id))
+    except Exception as e:
+        logger.warning(f"Reminder list cache invalidation failed: {e}")
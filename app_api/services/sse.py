@@ -0,0 +1,51 @@
+"""
+Server-Sent Events helpers
+"""
+
+import zlib
+import orjson
+from flask import Response, request, stream_with_context
+
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+
+def sse_event(payload) -> bytes:
+    """Encode payload as a pre-encoded SSE data frame"""
+    return _SSE_PREFIX + orjson.dumps(payload) + _SSE_SUFFIX
+
+
+def sse_raw_event(data: bytes) -> bytes:
+    """Wrap already JSON-encoded bytes as an SSE data frame"""
+    return _SSE_PREFIX + data + _SSE_SUFFIX
+
+
+def _gzip_frames(frames):
+    """Gzip a frame stream, sync-flushing after every frame so it is sent immediately"""
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for frame in frames:
+        yield compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def sse_response(frames) -> Response:
+    """
+    Build a streaming SSE response from a generator of encoded frames
+
+    The stream is gzip-compressed when the client accepts it; each frame is
+    flushed on its own so compression never delays delivery.
+    """
+    headers = {
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'Vary': 'Accept-Encoding'
+    }
+    if 'gzip' in request.accept_encodings:
+        frames = _gzip_frames(frames)
+        headers['Content-Encoding'] = 'gzip'
+
+    return Response(
+        stream_with_context(frames),
+        mimetype='text/event-stream',
+        headers=headers
+    )
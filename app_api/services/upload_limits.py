@@ -0,0 +1,34 @@
+"""
+Upload admission control
+
+Caps concurrent upload streams per API process and rate-limits uploads per
+owner (shared across processes through Redis). Vectorization itself is bounded
+by the Celery worker concurrency.
+"""
+
+import logging
+import threading
+from app_api import config
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
+
+upload_slots = threading.BoundedSemaphore(config.MAX_CONCURRENT_UPLOADS)
+
+
+def check_upload_rate(owner: str) -> bool:
+    """
+    Count an upload for owner and report whether it is within the rate limit
+
+    Fails open when Redis is unavailable.
+    """
+    key = f"uprate:{owner}"
+    try:
+        client = ks_redis()
+        count = client.incr(key)
+        if count == 1:
+            client.expire(key, config.UPLOAD_RATE_WINDOW)
+        return count <= config.UPLOAD_RATE_LIMIT
+    except Exception as e:
+        logger.warning(f"Upload rate limit check failed: {e}")
+        return True
@@ -1,10 +1,121 @@
+import hashlib
+from typing import Optional
+import msgspec
+from flask import request
+from werkzeug.exceptions import RequestEntityTooLarge
 from app_api import config
 
+ALLOWED_IMAGE_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'})
+
+# Precomputed lower-case suffix tuples for str.endswith
+_ALLOWED_FILE_SUFFIXES = tuple('.' + ext.lower() for ext in config.ALLOWED_EXTENSIONS)
+_ALLOWED_IMAGE_SUFFIXES = tuple('.' + ext.lower() for ext in ALLOWED_IMAGE_EXTENSIONS)
+
+def get_json_body():
+    """
+    Parse a small JSON request body without caching it on the request
+
+    Bodies declared larger than MAX_JSON_BODY_LENGTH are rejected with 413
+    before being read. Missing or malformed bodies return None.
+    """
+    content_length = request.content_length
+    if content_length is not None and content_length > config.MAX_JSON_BODY_LENGTH:
+        raise RequestEntityTooLarge()
+    return request.get_json(cache=False, silent=True)
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in config.ALLOWED_EXTENSIONS
+    return bool(filename) and filename.lower().endswith(_ALLOWED_FILE_SUFFIXES)
 
 def allowed_image(filename):
     """Check if file is an allowed image type"""
-    ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_IMAGE_EXTENSIONS
+    return bool(filename) and filename.lower().endswith(_ALLOWED_IMAGE_SUFFIXES)
+
+# Leading magic bytes per allowed extension
+_FILE_SIGNATURES = {
+    'pdf': b'%PDF-',
+    'xlsx': b'PK\x03\x04',  # ZIP container (Office Open XML)
+    'xls': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',  # OLE2 compound document
+}
+# PDF readers accept the header anywhere in the first 1024 bytes
+_PDF_HEADER_WINDOW = 1024
+
+def has_valid_signature(stream, file_ext):
+    """
+    Check the file's magic bytes against its extension
+
+    Only the head of the stream is read; the position is restored afterwards so
+    the stream can still be uploaded as a whole.
+    """
+    signature = _FILE_SIGNATURES.get(file_ext)
+    if signature is None:
+        return False
+
+    pos = stream.tell()
+    try:
+        if file_ext == 'pdf':
+            return signature in stream.read(_PDF_HEADER_WINDOW)
+        return stream.read(len(signature)) == signature
+    finally:
+        stream.seek(pos)
+
+
+_DIGEST_CHUNK_SIZE = 1 << 20
+
+def content_digest(stream):
+    """
+    Hash the stream contents (BLAKE2b, hex digest) for duplicate detection
+
+    The whole stream is read in chunks; the position is restored afterwards.
+    """
+    pos = stream.tell()
+    h = hashlib.blake2b(digest_size=32)
+    try:
+        stream.seek(0)
+        while chunk := stream.read(_DIGEST_CHUNK_SIZE):
+            h.update(chunk)
+    finally:
+        stream.seek(pos)
+    return h.hexdigest()
+
+def safe_filename(filename):
+    """
+    Reduce a client-supplied filename to its final path component
+
+    Unlike werkzeug's secure_filename this keeps non-ASCII (e.g. Chinese)
+    names intact. Returns '' if nothing usable is left.
+    """
+    name = filename.replace('\\', '/').rsplit('/', 1)[-1].replace('\x00', '').strip()
+    if name in ('.', '..'):
+        return ''
+    return name
+
+
+class ChatRequest(msgspec.Struct):
+    """Request body of POST /api/chat"""
+    message: str
+    history: Optional[list] = None
+    conversation_id: Optional[str] = None
+    enable_history: Optional[bool] = False
+    mode: Optional[str] = None
+    stream_content: Optional[bool] = True
+
+    def __post_init__(self):
+        # Older clients send null for the flags, which has always meant false
+        self.enable_history = bool(self.enable_history)
+        self.stream_content = bool(self.stream_content)
+
+
+class VisibilityRequest(msgspec.Struct):
+    """Request body of PUT /api/documents/<filename>/visibility"""
+    is_public: int
+
+
+def parse_json_body(schema):
+    """
+    Decode and validate the request body against a msgspec Struct
+
+    Raises:
+        msgspec.DecodeError: Body is not valid JSON or does not match schema
+    """
+    return msgspec.json.decode(request.get_data(), type=schema, strict=False)
@@ -0,0 +1,165 @@
+"""
+Celery tasks for document vectorization
+
+Uploads are vectorized by Celery workers (Redis broker/backend) instead of raw
+threads inside the Flask process. Workers publish progress snapshots to a Redis
+pub/sub channel keyed by task id, which the upload SSE endpoint relays.
+
+Start a worker with:
+    celery -A app_api.services.vectorize_tasks:celery_app worker --loglevel=info
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+import orjson
+from typing import Optional
+from urllib.parse import quote
+from celery import Celery
+import file_repository
+from app_api import config
+from document_vectorizer import VectorizationProgress
+from ks_infrastructure.configs import REDIS_CONFIG
+from ks_infrastructure.services.redis_service import ks_redis
+
+logger = logging.getLogger(__name__)
+
+
+def _redis_url() -> str:
+    """Build Redis URL for Celery broker/backend from ks_infrastructure config"""
+    password = REDIS_CONFIG.get('password')
+    auth = f":{quote(password, safe='')}@" if password else ""
+    return f"redis://{auth}{REDIS_CONFIG['host']}:{REDIS_CONFIG['port']}/{REDIS_CONFIG.get('db', 0)}"
+
+
+celery_app = Celery('km_vectorize', broker=_redis_url(), backend=_redis_url())
+celery_app.conf.update(
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,  # Vectorization is long-running, fetch one task at a time
+    worker_concurrency=config.VECTORIZE_WORKER_CONCURRENCY,  # Bounds peak memory per worker host
+    result_expires=3600
+)
+
+
+def _staging_dir():
+    """Directory for the worker's temp copy of an upload, or None for the default"""
+    tmpdir = config.VECTORIZE_TMPDIR
+    if not tmpdir:
+        return None
+    try:
+        # Uploads are capped at MAX_CONTENT_LENGTH; keep headroom for concurrent tasks
+        needed = config.MAX_CONTENT_LENGTH * config.VECTORIZE_WORKER_CONCURRENCY
+        if shutil.disk_usage(tmpdir).free >= needed:
+            return tmpdir
+    except OSError as e:
+        logger.warning(f"Staging dir {tmpdir} unavailable: {e}")
+    return None
+
+
+def progress_channel(task_id: str) -> str:
+    """Redis pub/sub channel carrying progress events for an upload task"""
+    return f"upload:{task_id}"
+
+
+def queued_task_count() -> Optional[int]:
+    """Number of vectorization tasks waiting in the broker queue (None if unknown)"""
+    try:
+        return ks_redis().llen(celery_app.conf.task_default_queue)
+    except Exception as e:
+        logger.warning(f"Queue length lookup failed: {e}")
+        return None
+
+
+class PublishingProgress(VectorizationProgress):
+    """VectorizationProgress that publishes every snapshot to a Redis channel"""
+
+    def __init__(self, channel: str):
+        self._channel = channel
+        self._redis = ks_redis()
+        self._last_published = b""
+        super().__init__()
+
+    def update(self, **kwargs):
+        """Update progress data and publish the snapshot if it changed"""
+        self._data.update(kwargs)
+        payload = orjson.dumps(self._data)
+        if payload != self._last_published:
+            self._redis.publish(self._channel, payload)
+            self._last_published = payload
+
+
+@celery_app.task(bind=True, name='app_api.vectorize_document')
+def vectorize_document_task(self, owner: str, filename: str, file_ext: str, file_hash: str = None):
+    """
+    Download an uploaded document from MinIO and vectorize it
+
+    Args:
+        owner: Document owner
+        filename: Document filename (as stored in MinIO)
+        file_ext: File extension without dot (pdf, xlsx, xls)
+        file_hash: Content hash stored with the vectors for duplicate detection
+
+    Returns:
+        Final progress snapshot
+    """
+    # Imported lazily so that the API process does not build a vectorizer for enqueueing
+    from app_api.services.agent_service import get_vectorizer
+
+    progress = PublishingProgress(progress_channel(self.request.id))
+    tmp_filepath = None
+
+    try:
+        # Stream the object from MinIO straight into the temp file
+        with tempfile.NamedTemporaryFile(
+            delete=False, suffix=f'.{file_ext}', dir=_staging_dir()
+        ) as tmp_file:
+            tmp_filepath = tmp_file.name
+            found = file_repository.download_file(
+                username=owner,
+                filename=filename,
+                file_obj=tmp_file,
+                bucket='kms'
+            )
+
+        if not found:
+            raise Exception("Failed to retrieve uploaded file from MinIO")
+
+        logger.info(f"Starting vectorization for {filename}")
+        get_vectorizer().vectorize_file(
+            tmp_filepath,
+            owner=owner,
+            display_filename=filename,
+            verbose=False,
+            progress_instance=progress,
+            enable_summary=False,  # Default: no LLM summary
+            file_hash=file_hash
+        )
+        logger.info(f"Vectorization completed for {filename}")
+        return progress.get()
+
+    except Exception as e:
+        logger.error(f"Vectorization failed for {filename}: {e}", exc_info=True)
+
+        # Update progress with error
+        error_message = f"向量化失败: {str(e)}"
+        progress.update(
+            stage="error",
+            error=error_message,
+            message=error_message
+        )
+        return progress.get()
+
+    finally:
+        # Clean up temporary file
+        if tmp_filepath:
+            try:
+                os.remove(tmp_filepath)
+                logger.info(f"Cleaned up temp file: {tmp_filepath}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to delete temp file {tmp_filepath}: {e}")
@@ -1,30 +1,29 @@
 import unittest
 import sys
 import os
+from datetime import datetime
 from unittest.mock import patch, MagicMock
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app_api.api import create_app
+from app_api.api import get_or_create_app
 
 class TestConversationsBlueprint(unittest.TestCase):
     def setUp(self):
-        self.app = create_app()
+        self.app = get_or_create_app()
         self.client = self.app.test_client()
         self.app.testing = True
 
     @patch('app_api.routes.conversations.get_current_user')
-    @patch('app_api.routes.conversations.list_conversations')
-    @patch('app_api.routes.conversations.count_conversations')
-    def test_get_conversations_route(self, mock_count, mock_list, mock_user):
+    @patch('app_api.routes.conversations.list_conversations_with_total')
+    def test_get_conversations_route(self, mock_list, mock_user):
         """Test that the GET /api/conversations route is registered and working"""
         print("\nTesting GET /api/conversations...")
         
         # Setup mocks
         mock_user.return_value = 'test_user'
-        mock_list.return_value = [{'id': 1, 'title': 'Test Conversation', 'owner': 'test_user'}]
-        mock_count.return_value = 1
+        mock_list.return_value = ([{'id': 1, 'title': 'Test Conversation', 'owner': 'test_user'}], 1)
 
         # Make request
         response = self.client.get('/api/conversations')
@@ -38,6 +37,43 @@ class TestConversationsBlueprint(unittest.TestCase):
         self.assertTrue(data['success'])
         self.assertEqual(len(data['data']['conversations']), 1)
         self.assertEqual(data['data']['conversations'][0]['title'], 'Test Conversation')
+        self.assertEqual(data['data']['total'], 1)
+
+    @patch('app_api.routes.conversations.get_current_user')
+    @patch('app_api.routes.conversations.list_conversations_after')
+    def test_get_conversations_cursor(self, mock_list, mock_user):
+        """Test keyset pagination: next_cursor round-trips into the next query"""
+        mock_user.return_value = 'test_user'
+        mock_list.return_value = [
+            {'id': 7, 'title': 'A', 'owner': 'test_user', 'updated_at': datetime(2025, 1, 2, 3, 4, 5)},
+            {'id': 5, 'title': 'B', 'owner': 'test_user', 'updated_at': datetime(2025, 1, 1, 0, 0, 0)},
+        ]
+
+        response = self.client.get('/api/conversations?limit=2&cursor=')
+        self.assertEqual(response.status_code, 200)
+        next_cursor = response.get_json()['data']['next_cursor']
+        self.assertIsNotNone(next_cursor)
+        mock_list.assert_called_with('test_user', 2, None)
+
+        self.client.get(f'/api/conversations?limit=2&cursor={next_cursor}')
+        mock_list.assert_called_with('test_user', 2, (datetime(2025, 1, 1, 0, 0, 0), 5))
+
+        response = self.client.get('/api/conversations?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+    @patch('app_api.routes.conversations.get_current_user')
+    @patch('app_api.routes.conversations.list_conversations_after')
+    @patch('app_api.routes.conversations.search_conversations')
+    def test_search_ignores_cursor(self, mock_search, mock_list, mock_user):
+        """Search keeps its keyword filter even when a cursor is passed"""
+        mock_user.return_value = 'test_user'
+        mock_search.return_value = [{'id': 3, 'title': 'foo bar', 'owner': 'test_user'}]
+
+        response = self.client.get('/api/conversations/search?q=foo&cursor=')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data']['keyword'], 'foo')
+        mock_search.assert_called_once_with('test_user', 'foo', 20)
+        mock_list.assert_not_called()
         
     @patch('app_api.routes.conversations.get_current_user')
     @patch('app_api.routes.conversations.create_conversation')
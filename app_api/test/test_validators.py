@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+from io import BytesIO
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import msgspec
+from app_api.services.validators import (
+    ChatRequest,
+    allowed_file,
+    allowed_image,
+    has_valid_signature,
+    content_digest,
+    safe_filename,
+)
+
+
+class TestValidators(unittest.TestCase):
+    def test_allowed_file(self):
+        self.assertTrue(allowed_file('doc.pdf'))
+        self.assertTrue(allowed_file('Sheet.XLSX'))
+        self.assertTrue(allowed_file('archive.tar.xls'))
+        self.assertFalse(allowed_file('doc.docx'))
+        self.assertFalse(allowed_file('pdf'))
+        self.assertFalse(allowed_file('doc.'))
+        self.assertFalse(allowed_file(''))
+        self.assertFalse(allowed_file(None))
+
+    def test_allowed_image(self):
+        self.assertTrue(allowed_image('photo.JPG'))
+        self.assertTrue(allowed_image('screen.webp'))
+        self.assertFalse(allowed_image('photo.tiff'))
+        self.assertFalse(allowed_image('png'))
+        self.assertFalse(allowed_image(''))
+
+    def test_signature_matches_extension(self):
+        self.assertTrue(has_valid_signature(BytesIO(b'%PDF-1.7\n...'), 'pdf'))
+        self.assertTrue(has_valid_signature(BytesIO(b'\r\n%PDF-1.4'), 'pdf'))
+        self.assertTrue(has_valid_signature(BytesIO(b'PK\x03\x04rest'), 'xlsx'))
+        self.assertTrue(has_valid_signature(BytesIO(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1rest'), 'xls'))
+
+    def test_signature_mismatch(self):
+        self.assertFalse(has_valid_signature(BytesIO(b'PK\x03\x04rest'), 'pdf'))
+        self.assertFalse(has_valid_signature(BytesIO(b'%PDF-1.7'), 'xlsx'))
+        self.assertFalse(has_valid_signature(BytesIO(b''), 'xls'))
+        self.assertFalse(has_valid_signature(BytesIO(b'%PDF-1.7'), 'docx'))
+
+    def test_signature_check_restores_position(self):
+        stream = BytesIO(b'%PDF-1.7 body')
+        has_valid_signature(stream, 'pdf')
+        self.assertEqual(stream.tell(), 0)
+
+    def test_content_digest(self):
+        stream = BytesIO(b'%PDF-1.7 body')
+        stream.seek(3)
+        digest = content_digest(stream)
+        self.assertEqual(stream.tell(), 3)
+        self.assertEqual(digest, content_digest(BytesIO(b'%PDF-1.7 body')))
+        self.assertNotEqual(digest, content_digest(BytesIO(b'%PDF-1.7 other')))
+
+    def test_safe_filename(self):
+        self.assertEqual(safe_filename('报告.pdf'), '报告.pdf')
+        self.assertEqual(safe_filename('../../etc/passwd.pdf'), 'passwd.pdf')
+        self.assertEqual(safe_filename('C:\\docs\\a.xlsx'), 'a.xlsx')
+        self.assertEqual(safe_filename('dir/..'), '')
+        self.assertEqual(safe_filename('  '), '')
+
+    def test_chat_request_defaults(self):
+        data = msgspec.json.decode(b'{"message": "hi"}', type=ChatRequest, strict=False)
+        self.assertIs(data.enable_history, False)
+        self.assertIs(data.stream_content, True)
+
+    def test_chat_request_null_flags(self):
+        body = b'{"message": "hi", "enable_history": null, "stream_content": null}'
+        data = msgspec.json.decode(body, type=ChatRequest, strict=False)
+        self.assertIs(data.enable_history, False)
+        self.assertIs(data.stream_content, False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,12 @@
+"""
+WSGI entrypoint for production servers
+
+Usage:
+    gunicorn -c app_api/gunicorn.conf.py app_api.wsgi:app
+"""
+
+from app_api.api import create_app
+
+# Services (Qdrant gRPC channel, MySQL pool, HTTP clients) hold sockets that must
+# not be shared across fork; gunicorn's post_fork hook initializes them per worker.
+app = create_app(init_services_on_startup=False)
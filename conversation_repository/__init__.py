@@ -9,6 +9,8 @@ from .db import (
     create_conversation,
     get_conversation,
     list_conversations,
+    list_conversations_with_total,
+    list_conversations_after,
     count_conversations,
     update_conversation_title,
     delete_conversation,
@@ -26,6 +28,8 @@ __all__ = [
     'create_conversation',
     'get_conversation',
     'list_conversations',
+    'list_conversations_with_total',
+    'list_conversations_after',
     'count_conversations',
     'update_conversation_title',
     'delete_conversation',
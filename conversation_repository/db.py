@@ -6,18 +6,28 @@
 import uuid
 import json
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from ks_infrastructure.db_session import db_session
 from ks_infrastructure.services.exceptions import KsConnectionError
 
 logger = logging.getLogger(__name__)
 
+# 本进程内是否已确认表存在（首次访问时检查，而不是在导入时连接数据库）
+_tables_ensured = False
+
 
 def _ensure_tables_exist():
     """
     确保会话管理相关的表存在，不存在则自动创建
+
+    每个进程只在首次访问时执行一次。导入模块时不连接数据库，
+    gunicorn preload 的 master 进程因此不会持有 MySQL 连接。
     """
+    global _tables_ensured
+    if _tables_ensured:
+        return
+
     # 会话表
     create_conversations_sql = """
     CREATE TABLE IF NOT EXISTS conversations (
@@ -31,7 +41,8 @@ def _ensure_tables_exist():
         INDEX idx_owner (owner),
         INDEX idx_created_at (created_at),
         INDEX idx_conversation_id (conversation_id),
-        INDEX idx_owner_created (owner, created_at DESC)
+        INDEX idx_owner_created (owner, created_at DESC),
+        INDEX idx_owner_updated (owner, updated_at DESC, id DESC)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='会话表'
     """
     
@@ -66,13 +77,17 @@ def _ensure_tables_exist():
         logger.error(f"Failed to create conversation tables: {e}")
         raise KsConnectionError(f"Failed to create conversation tables: {e}")
 
-
-# 确保模块导入时检查表是否存在
-_ensure_tables_exist()
+    _tables_ensured = True
 
 
 # ==================== 会话管理 ====================
 
+# 面向用户的消息：用户消息 + 有非空白内容的助手消息(排除纯工具调用、工具结果、系统提示词)
+_USER_VISIBLE_CLAUSE = (
+    "AND (role = 'user' OR (role = 'assistant' AND content REGEXP '[^[:space:]]'))"
+)
+
+
 def create_conversation(owner: str, title: str = None) -> str:
     """
     创建新会话
@@ -94,6 +109,7 @@ def create_conversation(owner: str, title: str = None) -> str:
     logger.debug(f"  执行SQL: {sql}")
     logger.debug(f"  参数: ({conversation_id}, {owner}, {title})")
 
+    _ensure_tables_exist()
     with db_session() as cursor:
         cursor.execute(sql, (conversation_id, owner, title))
 
@@ -121,6 +137,7 @@ def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
     logger.debug(f"  执行SQL: {sql}")
     logger.debug(f"  参数: ({conversation_id},)")
 
+    _ensure_tables_exist()
     with db_session(dictionary=True) as cursor:
         cursor.execute(sql, (conversation_id,))
         result = cursor.fetchone()
@@ -161,10 +178,120 @@ def list_conversations(owner: str, limit: int = 20, offset: int = 0) -> List[Dic
     """
     logger.debug(f"  执行SQL查询 (参数: owner={owner}, limit={limit}, offset={offset})")
 
+    _ensure_tables_exist()
+    with db_session(dictionary=True) as cursor:
+        cursor.execute(sql, (owner, limit, offset))
+        result = cursor.fetchall()
+
+    logger.debug(f"← 返回 {len(result)} 条会话记录")
+    return result
+
+
+def list_conversations_with_total(owner: str, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    获取用户的会话列表(分页)及会话总数，一次查询完成
+
+    总数通过窗口函数 COUNT(*) OVER () 与分页数据一起返回，省去单独的 COUNT 查询
+
+    Args:
+        owner: 用户标识
+        limit: 每页数量
+        offset: 偏移量
+
+    Returns:
+        Tuple[List[Dict], int]: (会话列表, 会话总数)
+    """
+    logger.debug(f"→ 调用 conversation_repository.db.list_conversations_with_total(owner={owner}, limit={limit}, offset={offset})")
+
+    sql = """
+        SELECT
+            c.id,
+            c.conversation_id,
+            c.owner,
+            c.title,
+            c.created_at,
+            c.updated_at,
+            COUNT(m.id) as message_count,
+            COUNT(*) OVER () as _total
+        FROM conversations c
+        LEFT JOIN conversation_messages m ON c.conversation_id = m.conversation_id
+        WHERE c.owner = %s AND c.is_deleted = 0
+        GROUP BY c.id
+        ORDER BY c.updated_at DESC
+        LIMIT %s OFFSET %s
+    """
+    logger.debug(f"  执行SQL查询 (参数: owner={owner}, limit={limit}, offset={offset})")
+
+    _ensure_tables_exist()
     with db_session(dictionary=True) as cursor:
         cursor.execute(sql, (owner, limit, offset))
         result = cursor.fetchall()
 
+    if result:
+        total = result[0]['_total']
+        for row in result:
+            del row['_total']
+    elif offset > 0:
+        # 超出末页时没有行可携带总数
+        total = count_conversations(owner)
+    else:
+        total = 0
+
+    logger.debug(f"← 返回 {len(result)} 条会话记录, total={total}")
+    return result, total
+
+
+def list_conversations_after(
+    owner: str,
+    limit: int = 20,
+    after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    获取用户的会话列表(游标分页)
+
+    按 (updated_at, id) 倒序，从游标之后开始读取 limit 条，
+    耗时与翻页深度无关（走 idx_owner_updated 索引，无需扫描并丢弃 OFFSET 行）
+
+    Args:
+        owner: 用户标识
+        limit: 每页数量
+        after: 上一页最后一条会话的 (updated_at, id)，为 None 时从第一页开始
+
+    Returns:
+        List[Dict]: 会话列表
+    """
+    logger.debug(f"→ 调用 conversation_repository.db.list_conversations_after(owner={owner}, limit={limit}, after={after})")
+
+    cursor_clause = ""
+    params = [owner]
+    if after is not None:
+        cursor_clause = "AND (c.updated_at < %s OR (c.updated_at = %s AND c.id < %s))"
+        params += [after[0], after[0], after[1]]
+    params.append(limit)
+
+    sql = f"""
+        SELECT
+            c.id,
+            c.conversation_id,
+            c.owner,
+            c.title,
+            c.created_at,
+            c.updated_at,
+            COUNT(m.id) as message_count
+        FROM conversations c
+        LEFT JOIN conversation_messages m ON c.conversation_id = m.conversation_id
+        WHERE c.owner = %s AND c.is_deleted = 0 {cursor_clause}
+        GROUP BY c.id
+        ORDER BY c.updated_at DESC, c.id DESC
+        LIMIT %s
+    """
+    logger.debug(f"  执行SQL查询 (参数: {params})")
+
+    _ensure_tables_exist()
+    with db_session(dictionary=True) as cursor:
+        cursor.execute(sql, params)
+        result = cursor.fetchall()
+
     logger.debug(f"← 返回 {len(result)} 条会话记录")
     return result
 
@@ -187,6 +314,7 @@ def count_conversations(owner: str) -> int:
     """
     logger.debug(f"  执行SQL: {sql}")
 
+    _ensure_tables_exist()
     with db_session() as cursor:
         cursor.execute(sql, (owner,))
         result = cursor.fetchone()
@@ -207,6 +335,7 @@ def update_conversation_title(conversation_id: str, title: str) -> bool:
     Returns:
         bool: 是否更新成功
     """
+    _ensure_tables_exist()
     with db_session() as cursor:
         cursor.execute(
             """
@@ -233,6 +362,7 @@ def delete_conversation(conversation_id: str) -> bool:
     Returns:
         bool: 是否删除成功
     """
+    _ensure_tables_exist()
     with db_session() as cursor:
         cursor.execute(
             """
@@ -274,6 +404,7 @@ def add_message(
     logger.debug(f"→ 调用 conversation_repository.db.add_message(conversation_id={conversation_id}, role={role}, content_len={len(content) if content else 0})")
 
     # 获取当前消息顺序
+    _ensure_tables_exist()
     with db_session() as cursor:
         cursor.execute(
             """
@@ -307,7 +438,8 @@ def add_message(
 
 def get_conversation_history(
     conversation_id: str,
-    limit: int = None
+    limit: int = None,
+    user_visible_only: bool = False
 ) -> List[Dict[str, Any]]:
     """
     获取会话的消息历史
@@ -315,20 +447,25 @@ def get_conversation_history(
     Args:
         conversation_id: 会话ID
         limit: 限制返回的消息数量(可选)
+        user_visible_only: 只返回面向用户的消息（用户消息 + 有内容的助手消息），
+                           过滤在 SQL 中完成；limit 作用于过滤后的消息
 
     Returns:
         List[Dict]: 消息列表，按时间顺序排序
     """
-    logger.debug(f"→ 调用 conversation_repository.db.get_conversation_history(conversation_id={conversation_id}, limit={limit})")
+    logger.debug(f"→ 调用 conversation_repository.db.get_conversation_history(conversation_id={conversation_id}, limit={limit}, user_visible_only={user_visible_only})")
+
+    visible_clause = _USER_VISIBLE_CLAUSE if user_visible_only else ""
 
+    _ensure_tables_exist()
     with db_session(dictionary=True) as cursor:
         if limit:
             # 获取最近的N条消息
-            sql = """
+            sql = f"""
                 SELECT id, conversation_id, role, content, tool_calls, tool_call_id,
                        message_order, created_at
                 FROM conversation_messages
-                WHERE conversation_id = %s
+                WHERE conversation_id = %s {visible_clause}
                 ORDER BY message_order DESC
                 LIMIT %s
             """
@@ -338,11 +475,11 @@ def get_conversation_history(
             # 反转顺序，使其按时间正序
             messages.reverse()
         else:
-            sql = """
+            sql = f"""
                 SELECT id, conversation_id, role, content, tool_calls, tool_call_id,
                        message_order, created_at
                 FROM conversation_messages
-                WHERE conversation_id = %s
+                WHERE conversation_id = %s {visible_clause}
                 ORDER BY message_order ASC
             """
             logger.debug(f"  执行SQL查询 (无limit)")
@@ -377,6 +514,7 @@ def get_messages_by_time_range(
     Returns:
         List[Dict]: 消息列表
     """
+    _ensure_tables_exist()
     with db_session(dictionary=True) as cursor:
         cursor.execute(
             """
@@ -419,6 +557,7 @@ def search_conversations(owner: str, keyword: str, limit: int = 20) -> List[Dict
     """
     search_pattern = f"%{keyword}%"
     
+    _ensure_tables_exist()
     with db_session(dictionary=True) as cursor:
         cursor.execute(
             """
@@ -447,6 +586,7 @@ def clear_conversation_messages(conversation_id: str) -> int:
     Returns:
         int: 删除的消息数量
     """
+    _ensure_tables_exist()
     with db_session() as cursor:
         cursor.execute(
             """
@@ -13,7 +13,8 @@ CREATE TABLE IF NOT EXISTS conversations (
     INDEX idx_owner (owner),
     INDEX idx_created_at (created_at),
     INDEX idx_conversation_id (conversation_id),
-    INDEX idx_owner_created (owner, created_at DESC)
+    INDEX idx_owner_created (owner, created_at DESC),
+    INDEX idx_owner_updated (owner, updated_at DESC, id DESC)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='会话表';
 
 -- 会话消息表
@@ -31,7 +31,7 @@ if [ ! -d "/app/app_api" ]; then
 fi
 
 # 启动 Nginx（后台模式）
-echo "[1/2] Starting Nginx..."
+echo "[1/3] Starting Nginx..."
 nginx &
 NGINX_PID=$!
 
@@ -45,15 +45,23 @@ fi
 
 echo "✓ Nginx started successfully (PID: $NGINX_PID)"
 
-# 启动 Flask API（前台模式）
-echo "[2/2] Starting Flask API..."
 cd /app
 
 # 设置 Python 路径
 export PYTHONPATH=/app:$PYTHONPATH
 
-# 启动 Flask（前台运行，这样容器不会退出）
-exec python -u -m app_api.api
+# 启动向量化 Worker（后台模式）
+echo "[2/3] Starting vectorization worker..."
+celery -A app_api.services.vectorize_tasks:celery_app worker --loglevel=info \
+    >> /var/log/km-agent/worker.log 2>&1 &
+WORKER_PID=$!
+echo "✓ Worker started (PID: $WORKER_PID)"
+
+# 启动 Flask API（前台模式）
+echo "[3/3] Starting Flask API..."
+
+# 使用 gunicorn 启动 Flask（前台运行，这样容器不会退出）
+exec gunicorn -c app_api/gunicorn.conf.py app_api.wsgi:app
 
 # 注意：上面的 exec 会替换当前 shell 进程
-# 如果 Flask 崩溃，容器会退出，Docker 可以自动重启
+# 如果 gunicorn 崩溃，容器会退出，Docker 可以自动重启
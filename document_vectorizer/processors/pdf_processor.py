@@ -1,7 +1,7 @@
 import os
 import sys
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from .base import BaseProcessor
 from ..domain import DocumentChunk
 
@@ -53,27 +53,34 @@ class PDFProcessor(BaseProcessor):
             verbose: bool (default True)
             enable_summary: bool (default False) - Whether to generate LLM summary
         """
+        return list(self.iter_chunks(file_path, **kwargs))
+
+    def iter_chunks(self, file_path: str, **kwargs) -> Iterator[DocumentChunk]:
+        """
+        Process PDF file page by page, yielding each page's chunk as soon as
+        the page is parsed. Accepts the same kwargs as process().
+        """
         verbose = kwargs.get("verbose", True)
         progress_callback = kwargs.get("progress_callback")
         enable_summary = kwargs.get("enable_summary", False)
+        total_pages = 0
         
         # 1. Parse PDF
         def parsing_callback(current, total, msg):
+            nonlocal total_pages
+            total_pages = total
             if progress_callback:
                 progress_callback(current, total, f"Parsing PDF: {current}/{total}")
 
-        result = self.pdf_converter.convert(
+        pages = self.pdf_converter.iter_pages(
             file_path, 
             analyze_images=True, 
             verbose=verbose,
             progress_callback=parsing_callback
         )
         
-        total_pages = result['total_pages']
-        chunks = []
-        
         # 2. Process Pages
-        for page in result['pages']:
+        for page in pages:
             page_number = page['page_number']
             paragraphs = page['paragraphs']
             page_content = "\n\n".join(paragraphs)
@@ -91,7 +98,7 @@ class PDFProcessor(BaseProcessor):
                 # Default: Use first 200 chars as summary
                 summary = page_content[:200]
 
-            chunk = DocumentChunk(
+            yield DocumentChunk(
                 content=page_content,
                 summary=summary,
                 metadata={
@@ -100,6 +107,3 @@ class PDFProcessor(BaseProcessor):
                 },
                 chunk_id=str(uuid.uuid4())
             )
-            chunks.append(chunk)
-
-        return chunks
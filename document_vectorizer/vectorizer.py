@@ -6,9 +6,16 @@ Fully compatible with PDFVectorizer interface for backward compatibility.
 """
 
 import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from typing import Dict, List, Optional
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, FilterSelector,
+    PayloadSchemaType
+)
 
 # Import infrastructure
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,6 +25,15 @@ from ks_infrastructure import ks_embedding, ks_qdrant
 from .processors.pdf_processor import PDFProcessor
 from .processors.excel_processor import ExcelProcessor
 
+# Chunks per embedding request (each chunk contributes summary + content)
+EMBED_BATCH_SIZE = 32
+# Embedding requests in flight at once
+EMBED_MAX_WORKERS = 4
+# Payload fields used in delete/dedup filters, indexed as keywords
+PAYLOAD_INDEX_FIELDS = ("owner", "filename", "file_hash")
+# Flush a partial PDF batch once its first page has waited this long (seconds)
+EMBED_FLUSH_INTERVAL = 2.0
+
 class VectorizationProgress:
     """
     Progress tracking object for document vectorization.
@@ -67,6 +83,54 @@ class VectorizationProgress:
         return self._data["stage"] in ["init", "parsing", "processing", "storing"]
 
 
+class _Prefetcher:
+    """
+    Runs an iterator on a background thread, handing items over a bounded queue.
+
+    Lets the consumer wait for the next item with a timeout (so it can act on
+    deadlines while the producer is busy) and keeps at most maxsize items
+    buffered. get() re-raises the producer's exception and returns _END once
+    the iterator is exhausted.
+    """
+    _END = object()
+
+    def __init__(self, iterable, maxsize: int):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(iterable,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, iterable):
+        try:
+            for item in iterable:
+                if not self._put((True, item)):
+                    return
+        except BaseException as e:
+            self._put((False, e))
+            return
+        self._put((True, self._END))
+
+    def get(self, timeout: Optional[float] = None):
+        """Next item, or _END; raises queue.Empty on timeout"""
+        ok, item = self._queue.get(timeout=timeout)
+        if not ok:
+            raise item
+        return item
+
+    def close(self):
+        """Stop the producer after its current item"""
+        self._stop.set()
+
+
 class DocumentVectorizer:
     """
     Universal Document Vectorizer.
@@ -99,8 +163,8 @@ class DocumentVectorizer:
             ".xls": ExcelProcessor()
         }
         
-        self.progress = VectorizationProgress()
         self._ensure_collection()
+        self._ensure_payload_indexes()
 
     def _ensure_collection(self):
         """Ensure Qdrant collection exists, create if not."""
@@ -130,12 +194,99 @@ class DocumentVectorizer:
         except Exception as e:
             raise Exception(f"Failed to ensure collection: {e}")
 
+    def _ensure_payload_indexes(self):
+        """Create keyword indexes for the filter fields (no-op if they exist)."""
+        for field in PAYLOAD_INDEX_FIELDS:
+            try:
+                self.qdrant_client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
+            except Exception as e:
+                print(f"⚠ Warning: Failed to create payload index on {field}: {e}")
+
     def _get_embedding(self, text: str) -> List[float]:
         """Get embedding vector for text."""
         if not text or not isinstance(text, str):
             text = " "
         return self.embedding_service.get_embedding_vector(text)
 
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Get embedding vectors for several texts in one request (duplicates embedded once)."""
+        texts = [t if t and isinstance(t, str) else " " for t in texts]
+        unique = list(dict.fromkeys(texts))
+        vectors = dict(zip(unique, self.embedding_service.get_embedding_vectors(unique)))
+        return [vectors[t] for t in texts]
+
+    def _embed_chunks(self, chunks: List, progress: VectorizationProgress,
+                      start_percent: float, span_percent: float) -> List[tuple]:
+        """
+        Embed summary and content of all chunks in concurrent batches.
+
+        Returns:
+            (summary_vector, content_vector) per chunk, in chunk order
+        """
+        batches = [chunks[i:i + EMBED_BATCH_SIZE] for i in range(0, len(chunks), EMBED_BATCH_SIZE)]
+        total_batches = len(batches)
+        results = [None] * total_batches
+
+        def embed_batch(batch):
+            texts = [text for chunk in batch for text in (chunk.summary, chunk.content)]
+            vectors = self._get_embeddings(texts)
+            return list(zip(vectors[0::2], vectors[1::2]))
+
+        with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as pool:
+            futures = {pool.submit(embed_batch, batch): k for k, batch in enumerate(batches)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                progress.update(
+                    message="内容向量化",
+                    current_step=f"已向量化批次 {done}/{total_batches}",
+                    progress_percent=start_percent + (done / total_batches) * span_percent,
+                    data={"batch": done, "total_batches": total_batches}
+                )
+
+        return [pair for batch in results for pair in batch]
+
+    def _store_batch(self, chunks: List, first_id: int, owner: str, filename: str,
+                     file_hash: Optional[str]) -> int:
+        """
+        Embed a batch of PDF page chunks and upsert them as points.
+
+        Returns:
+            Number of points stored
+        """
+        texts = [text for chunk in chunks for text in (chunk.summary, chunk.content)]
+        vectors = self._get_embeddings(texts)
+
+        points = []
+        for offset, chunk in enumerate(chunks):
+            # Create point with PDFVectorizer-compatible payload structure
+            point = PointStruct(
+                id=first_id + offset,
+                vector={
+                    "summary_vector": vectors[2 * offset],
+                    "content_vector": vectors[2 * offset + 1]
+                },
+                payload={
+                    "owner": owner,
+                    "filename": filename,
+                    "page_number": chunk.metadata["page_number"],
+                    "summary": chunk.summary,
+                    "content": chunk.content
+                }
+            )
+            if file_hash:
+                point.payload["file_hash"] = file_hash
+            points.append(point)
+
+        self.qdrant_client.upsert(
+            collection_name=self.collection_name,
+            points=points
+        )
+        return len(points)
+
     def delete_document(self, filename: str, owner: str, verbose: bool = True):
         """
         Delete all chunks of a document by filename and owner.
@@ -149,32 +300,75 @@ class DocumentVectorizer:
         try:
             self._ensure_collection()
             
-            scroll_result = self.qdrant_client.scroll(
+            # One filtered delete instead of scroll + delete by ids
+            self.qdrant_client.delete(
                 collection_name=self.collection_name,
-                scroll_filter=Filter(
-                    must=[
-                        FieldCondition(key="filename", match=MatchValue(value=filename)),
-                        FieldCondition(key="owner", match=MatchValue(value=owner))
-                    ]
-                ),
-                limit=10000
-            )
-            
-            points_to_delete = [point.id for point in scroll_result[0]]
-            if points_to_delete:
-                self.qdrant_client.delete(
-                    collection_name=self.collection_name,
-                    points_selector=points_to_delete
+                points_selector=FilterSelector(
+                    filter=Filter(
+                        must=[
+                            FieldCondition(key="filename", match=MatchValue(value=filename)),
+                            FieldCondition(key="owner", match=MatchValue(value=owner))
+                        ]
+                    )
                 )
-                if verbose:
-                    print(f"✓ Deleted {len(points_to_delete)} existing pages for: {filename} (owner: {owner})")
-            else:
-                if verbose:
-                    print(f"✓ No existing pages found for: {filename} (owner: {owner})")
+            )
+            if verbose:
+                print(f"✓ Deleted existing pages for: {filename} (owner: {owner})")
         except Exception as e:
             if verbose:
                 print(f"⚠ Warning: Failed to delete existing pages: {e}")
 
+    def _document_filter(self, filename: str, owner: str, file_hash: str) -> Filter:
+        """Filter matching the points of one ingest of (owner, filename, file_hash)"""
+        return Filter(
+            must=[
+                FieldCondition(key="filename", match=MatchValue(value=filename)),
+                FieldCondition(key="owner", match=MatchValue(value=owner)),
+                FieldCondition(key="file_hash", match=MatchValue(value=file_hash))
+            ]
+        )
+
+    def _mark_complete(self, filename: str, owner: str, file_hash: Optional[str]):
+        """
+        Flag every stored point of a finished ingest as complete.
+
+        Runs only after all points are stored, so has_document never mistakes
+        a running (or failed) ingest for a finished one.
+        """
+        if not file_hash:
+            return
+        self.qdrant_client.set_payload(
+            collection_name=self.collection_name,
+            payload={"ingest_complete": True},
+            points=FilterSelector(filter=self._document_filter(filename, owner, file_hash))
+        )
+
+    def has_document(self, filename: str, owner: str, file_hash: str) -> bool:
+        """
+        Check whether a document with identical content is already vectorized.
+
+        Args:
+            filename: Document filename
+            owner: Owner of the document
+            file_hash: Content hash stored in the payload at ingest time
+
+        Returns:
+            True if a completed ingest exists for (owner, filename, file_hash)
+        """
+        doc_filter = self._document_filter(filename, owner, file_hash)
+        doc_filter.must.append(
+            FieldCondition(key="ingest_complete", match=MatchValue(value=True))
+        )
+        # Fetch at most one matching point: an exact answer without counting
+        points, _ = self.qdrant_client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=doc_filter,
+            limit=1,
+            with_payload=False,
+            with_vectors=False
+        )
+        return bool(points)
+
     def vectorize_pdf(
         self,
         pdf_path: str,
@@ -182,7 +376,8 @@ class DocumentVectorizer:
         display_filename: str = None,
         verbose: bool = True,
         progress_instance: VectorizationProgress = None,
-        enable_summary: bool = False
+        enable_summary: bool = False,
+        file_hash: Optional[str] = None
     ) -> Dict:
         """
         Vectorize PDF file.
@@ -195,12 +390,13 @@ class DocumentVectorizer:
             verbose: Whether to print progress
             progress_instance: Optional dedicated progress instance
             enable_summary: Whether to generate LLM summary (default: False)
+            file_hash: Optional content hash stored in every point payload
 
         Returns:
             Dictionary with processing results
         """
-        # Use provided progress instance or fall back to self.progress
-        progress = progress_instance if progress_instance is not None else self.progress
+        # Progress is per call: a shared instance would mix concurrent jobs
+        progress = progress_instance if progress_instance is not None else VectorizationProgress()
         progress.reset()
         
         self._ensure_collection()
@@ -243,43 +439,6 @@ class DocumentVectorizer:
             if verbose:
                 print("\nStep 1: Parsing PDF...")
 
-            def parsing_callback(current, total, msg):
-                percent = 5 + (current / total) * 10
-                progress.update(
-                    stage="parsing",
-                    total_pages=total,
-                    current_page=current,
-                    message="正在解析文档",
-                    current_step=f"解析第 {current}/{total} 页",
-                    progress_percent=percent,
-                    data={"parsed_pages": current, "total_pages": total}
-                )
-                if verbose:
-                    print(f"  - Parsing: {current}/{total}")
-
-            processor = self.processors[".pdf"]
-            chunks = processor.process(
-                pdf_path,
-                progress_callback=parsing_callback,
-                verbose=verbose,
-                enable_summary=enable_summary
-            )
-
-            total_pages = len(chunks)
-            progress.update(
-                total_pages=total_pages,
-                current_page=total_pages,
-                message=f"文档解析完成，共 {total_pages} 页",
-                progress_percent=15
-            )
-            
-            if verbose:
-                print(f"✓ Parsed {total_pages} pages\n")
-            
-            # Vectorize and store
-            progress.update(stage="processing")
-            points = []
-            
             # Get max point_id
             try:
                 collection_info = self.qdrant_client.get_collection(self.collection_name)
@@ -298,106 +457,144 @@ class DocumentVectorizer:
                 if verbose:
                     print(f"⚠ Warning: Could not get max point_id, starting from 0: {e}")
                 point_id = 0
-            
-            for i, chunk in enumerate(chunks):
-                page_number = chunk.metadata["page_number"]
-                page_progress = 15 + (page_number / total_pages) * 70
-                
-                progress.update(
-                    current_page=page_number,
-                    message="生成页面摘要",
-                    current_step="生成摘要",
-                    progress_percent=page_progress,
-                    data={"page_number": page_number}
-                )
-                
-                if verbose:
-                    print(f"Processing Page {page_number}...")
-                    print(f"  - Generating summary vector...")
-                
-                # Vectorize
-                summary_vec = self._get_embedding(chunk.summary)
-                
-                progress.update(
-                    current_step="内容向量化",
-                    progress_percent=page_progress + (70 / total_pages * 0.6),
-                    message="内容向量化"
-                )
-                
-                if verbose:
-                    print(f"  - Generating content vector...")
-                
-                content_vec = self._get_embedding(chunk.content)
-                
-                # Create point with PDFVectorizer-compatible payload structure
-                point = PointStruct(
-                    id=point_id,
-                    vector={
-                        "summary_vector": summary_vec,
-                        "content_vector": content_vec
-                    },
-                    payload={
-                        "owner": owner,
-                        "filename": filename,
-                        "page_number": page_number,
-                        "summary": chunk.summary,
-                        "content": chunk.content
-                    }
-                )
-                points.append(point)
-                point_id += 1
-                
+
+            # Pipeline: a background thread parses pages (producer), this thread
+            # batches them, and batches are embedded and upserted on the pool.
+            # Progress follows stored pages, i.e. the stage furthest behind.
+            parsed_pages = 0
+            stored_pages = 0
+            total_in_doc = 0
+
+            def store_percent():
+                return 5 + (stored_pages / max(total_in_doc, 1)) * 85
+
+            def parsing_callback(current, total, msg):
+                nonlocal parsed_pages, total_in_doc
+                parsed_pages, total_in_doc = current, total
                 progress.update(
-                    current_step="页面处理完成",
-                    progress_percent=page_progress + (70 / total_pages),
-                    message="页面处理完成",
-                    data={
-                        "page_number": page_number,
-                        "summary_length": len(chunk.summary),
-                        "content_length": len(chunk.content)
-                    }
+                    stage="parsing",
+                    total_pages=total,
+                    current_page=current,
+                    message="正在解析文档",
+                    current_step=f"解析第 {current}/{total} 页",
+                    progress_percent=store_percent(),
+                    data={"parsed_pages": current, "stored_pages": stored_pages, "total_pages": total}
                 )
-                
                 if verbose:
-                    print(f"  ✓ Page {page_number} processed (summary: {len(chunk.summary)} chars, content: {len(chunk.content)} chars)\n")
-            
-            # Store in Qdrant
-            progress.update(
-                stage="storing",
-                current_page=total_pages,
-                message=f"正在存储 {len(points)} 个向量到数据库...",
-                current_step="数据存储",
-                progress_percent=90,
-                data={"total_vectors": len(points)}
-            )
-            
-            if verbose:
-                print(f"Storing {len(points)} vectors in Qdrant...")
-            
-            self.qdrant_client.upsert(
-                collection_name=self.collection_name,
-                points=points
+                    print(f"  - Parsing: {current}/{total}")
+
+            def collect(futures):
+                nonlocal stored_pages
+                for future in futures:
+                    stored_pages += future.result()
+                if futures:
+                    progress.update(
+                        message="内容向量化",
+                        current_step=f"已存储 {stored_pages} 页",
+                        progress_percent=store_percent(),
+                        data={"parsed_pages": parsed_pages, "stored_pages": stored_pages, "total_pages": total_in_doc}
+                    )
+
+            processor = self.processors[".pdf"]
+            pending = set()
+            batch = []
+            total_pages = 0
+            batch_started = 0.0
+
+            # Parsing off this thread lets a partial batch be flushed as soon as
+            # its deadline passes, even while a slow page is being parsed
+            source = _Prefetcher(
+                processor.iter_chunks(
+                    pdf_path,
+                    progress_callback=parsing_callback,
+                    verbose=verbose,
+                    enable_summary=enable_summary
+                ),
+                maxsize=EMBED_BATCH_SIZE
             )
-            
+
+            with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as pool:
+                try:
+                    while True:
+                        timeout = None
+                        if batch:
+                            timeout = max(batch_started + EMBED_FLUSH_INTERVAL - time.monotonic(), 0)
+                        try:
+                            chunk = source.get(timeout=timeout)
+                        except queue.Empty:
+                            chunk = None  # Deadline passed with the batch still partial
+                        if chunk is _Prefetcher._END:
+                            break
+
+                        if chunk is not None:
+                            if not batch:
+                                batch_started = time.monotonic()
+                            batch.append(chunk)
+                            total_pages += 1
+
+                        # Flush on size, or once the batch's first page has waited long enough
+                        if batch and (len(batch) >= EMBED_BATCH_SIZE
+                                      or time.monotonic() - batch_started >= EMBED_FLUSH_INTERVAL):
+                            pending.add(pool.submit(
+                                self._store_batch, batch, point_id, owner, filename, file_hash
+                            ))
+                            point_id += len(batch)
+                            batch = []
+
+                        done = {f for f in pending if f.done()}
+                        pending -= done
+                        # Backpressure: bound the parsed-but-unstored pages held in memory
+                        if len(pending) >= EMBED_MAX_WORKERS * 2:
+                            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            done |= finished
+                        collect(done)
+
+                    if batch:
+                        pending.add(pool.submit(
+                            self._store_batch, batch, point_id, owner, filename, file_hash
+                        ))
+
+                    if verbose:
+                        print(f"✓ Parsed {total_pages} pages, storing remaining vectors...\n")
+
+                    progress.update(
+                        stage="storing",
+                        total_pages=total_pages,
+                        current_page=total_pages,
+                        message=f"文档解析完成，共 {total_pages} 页，正在存储向量...",
+                        current_step="数据存储",
+                        progress_percent=store_percent()
+                    )
+                    for future in as_completed(pending):
+                        collect([future])
+                except Exception:
+                    for future in pending:
+                        future.cancel()
+                    raise
+                finally:
+                    source.close()
+
+            self._mark_complete(filename, owner, file_hash)
+
             # Completed
             final_result = {
                 "filename": filename,
                 "owner": owner,
                 "total_pages": total_pages,
-                "processed_pages": len(points),
+                "processed_pages": stored_pages,
                 "collection": self.collection_name
             }
             
             progress.update(
                 stage="completed",
-                message=f"处理完成！成功存储 {len(points)} 页",
+                message=f"处理完成！成功存储 {stored_pages} 页",
                 current_step="完成",
                 progress_percent=100,
                 data=final_result
             )
             
             if verbose:
-                print(f"✓ Successfully stored {len(points)} pages in Qdrant\n")
+                print(f"✓ Successfully stored {stored_pages} pages in Qdrant\n")
                 print(f"{'='*60}")
                 print(f"Processing complete!")
                 print(f"{'='*60}\n")
@@ -411,6 +608,12 @@ class DocumentVectorizer:
                 print(f"ERROR: {error_msg}")
                 print(f"{'='*60}\n")
             
+            # Drop pages already upserted by the pipeline before the failure
+            try:
+                self.delete_document(filename, owner, verbose=False)
+            except Exception:
+                pass
+
             progress.update(
                 stage="error",
                 message=error_msg,
@@ -438,6 +641,7 @@ class DocumentVectorizer:
                 - display_filename: Optional display filename
                 - progress_instance: Optional progress tracker
                 - enable_summary: bool (default False) - Enable LLM summary generation
+                - file_hash: Optional content hash stored in every point payload
 
                 Excel-specific:
                 - min_chinese_chars: int (default 250) - Minimum Chinese chars per chunk
@@ -454,7 +658,8 @@ class DocumentVectorizer:
                 display_filename=kwargs.get("display_filename"),
                 verbose=verbose,
                 progress_instance=kwargs.get("progress_instance"),
-                enable_summary=kwargs.get("enable_summary", False)
+                enable_summary=kwargs.get("enable_summary", False),
+                file_hash=kwargs.get("file_hash")
             )
         
         # Handle Excel files
@@ -462,7 +667,7 @@ class DocumentVectorizer:
             raise ValueError(f"Unsupported file type: {ext}")
         
         # Excel vectorization
-        progress = kwargs.get("progress_instance") or self.progress
+        progress = kwargs.get("progress_instance") or VectorizationProgress()
         progress.reset()
         
         display_filename = kwargs.get("display_filename") or filename
@@ -562,24 +767,13 @@ class DocumentVectorizer:
                     print(f"⚠ Warning: Could not get max point_id, starting from 0: {e}")
                 point_id = 0
             
-            for i, chunk in enumerate(chunks):
-                chunk_progress = 40 + (i / total_chunks) * 50
-                
-                progress.update(
-                    current_page=i + 1,
-                    message="向量化数据块",
-                    current_step=f"向量化 {i+1}/{total_chunks}",
-                    progress_percent=chunk_progress,
-                    data={"chunk_number": i + 1}
-                )
-                
-                if verbose and i % 10 == 0:
-                    print(f"Processing chunk {i+1}/{total_chunks}...")
-                
-                # Vectorize
-                summary_vec = self._get_embedding(chunk.summary)
-                content_vec = self._get_embedding(chunk.content)
-                
+            if verbose:
+                print(f"Generating vectors for {total_chunks} chunks...")
+
+            # Vectorize summary and content of all chunks in batched embedding requests
+            vectors = self._embed_chunks(chunks, progress, start_percent=40, span_percent=50)
+
+            for i, (chunk, (summary_vec, content_vec)) in enumerate(zip(chunks, vectors)):
                 # For Excel, we need to adapt the payload structure
                 # Use row_number instead of page_number for Excel
                 row_info = chunk.metadata.get("row_number") or chunk.metadata.get("start_row", i)
@@ -600,6 +794,8 @@ class DocumentVectorizer:
                         **{k: v for k, v in chunk.metadata.items() if k not in ["row_number", "start_row", "end_row"]}
                     }
                 )
+                if kwargs.get("file_hash"):
+                    point.payload["file_hash"] = kwargs["file_hash"]
                 points.append(point)
                 point_id += 1
             
@@ -624,6 +820,7 @@ class DocumentVectorizer:
                     collection_name=self.collection_name,
                     points=batch
                 )
+            self._mark_complete(display_filename, owner, kwargs.get("file_hash"))
             
             # Completed
             final_result = {
@@ -6,6 +6,9 @@
 from .repository import (
     upload_file,
     get_file,
+    get_file_stream,
+    download_file,
+    get_presigned_url,
     list_user_files,
     get_owner_file_list,
     set_file_public,
@@ -15,6 +18,9 @@ from .repository import (
 __all__ = [
     'upload_file',
     'get_file',
+    'get_file_stream',
+    'download_file',
+    'get_presigned_url',
     'list_user_files',
     'get_owner_file_list',
     'set_file_public',
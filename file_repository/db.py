@@ -16,6 +16,12 @@ logger = logging.getLogger(__name__)
 # 表名
 TABLE_NAME = "file_metadata"
 
+# get_owner_files 允许选择的列
+_COLUMNS = frozenset({
+    "id", "file_path", "owner", "filename", "bucket", "is_public",
+    "content_type", "file_size", "created_at", "updated_at"
+})
+
 
 def _ensure_table_exists() -> None:
     """
@@ -102,7 +108,8 @@ def save_file_metadata(
 
 def get_owner_files(
     owner: str,
-    include_public: bool = False
+    include_public: bool = False,
+    fields: Optional[list[str]] = None
 ) -> list[dict]:
     """
     获取所有者的文件列表
@@ -112,13 +119,23 @@ def get_owner_files(
         include_public: 是否包含公开文件 (is_public=1)
                        - False: 只返回所有者的文件
                        - True: 返回所有者的文件 + 所有公开文件
+        fields: 只查询这些列(可选),默认返回所有字段
 
     Returns:
-        list[dict]: 文件列表,每个文件包含所有字段
+        list[dict]: 文件列表,每个文件包含所有字段(或fields指定的字段)
 
     Raises:
+        ValueError: fields 包含未知列
         KsConnectionError: 查询失败时抛出
     """
+    if fields:
+        unknown = set(fields) - _COLUMNS
+        if unknown:
+            raise ValueError(f"未知字段: {sorted(unknown)}")
+        columns = ", ".join(fields)
+    else:
+        columns = "*"
+
     _ensure_table_exists()
     
     try:
@@ -126,7 +143,7 @@ def get_owner_files(
             if include_public:
                 # 查询所有者的文件 + 所有公开文件(仅限kms bucket)
                 sql = f"""
-                SELECT * FROM {TABLE_NAME}
+                SELECT {columns} FROM {TABLE_NAME}
                 WHERE (owner = %s OR is_public = 1) AND bucket = 'kms'
                 ORDER BY created_at DESC
                 """
@@ -134,7 +151,7 @@ def get_owner_files(
             else:
                 # 只查询所有者的文件(仅限kms bucket)
                 sql = f"""
-                SELECT * FROM {TABLE_NAME}
+                SELECT {columns} FROM {TABLE_NAME}
                 WHERE owner = %s AND bucket = 'kms'
                 ORDER BY created_at DESC
                 """
@@ -5,7 +5,10 @@
 
 import logging
 import json
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from typing import Optional, BinaryIO
+from urllib.parse import quote
 from botocore.exceptions import ClientError
 
 from ks_infrastructure.services.minio_service import ks_minio
@@ -24,6 +27,9 @@ DEFAULT_BUCKET = "kms"
 # 用于跟踪已设置公开策略的桶
 _public_buckets_configured = set()
 
+# 本进程内已确认存在的桶，避免每次上传都调用 list_buckets
+_ensured_buckets = set()
+
 
 def _set_bucket_public(client, bucket_name: str) -> None:
     """
@@ -68,6 +74,9 @@ def _ensure_bucket_exists(client, bucket_name: str) -> None:
         client: MinIO客户端
         bucket_name: bucket名称
     """
+    if bucket_name in _ensured_buckets:
+        return
+
     try:
         # 使用 list_buckets 检查 bucket 是否存在
         response = client.list_buckets()
@@ -92,6 +101,8 @@ def _ensure_bucket_exists(client, bucket_name: str) -> None:
             _set_bucket_public(client, bucket_name)
             _public_buckets_configured.add(bucket_name)
 
+        _ensured_buckets.add(bucket_name)
+
     except KsConnectionError:
         raise
     except ClientError as e:
@@ -162,6 +173,8 @@ def upload_file(
 
         return object_key
     except Exception as e:
+        # 桶可能已被外部删除，下次上传时重新检查
+        _ensured_buckets.discard(bucket)
         raise KsConnectionError(f"文件上传失败: {e}")
 
 
@@ -199,6 +212,159 @@ def get_file(
         raise KsConnectionError(f"文件查询失败: {e}")
 
 
+def get_file_stream(
+    username: str,
+    filename: str,
+    bucket: str = DEFAULT_BUCKET,
+    byte_range: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    if_modified_since: Optional[datetime] = None
+) -> Optional[dict]:
+    """
+    从MinIO以流的方式获取文件（不把文件整体读入内存）
+
+    Args:
+        username: 用户名
+        filename: 文件名
+        bucket: bucket名称，默认为'kms'
+        byte_range: HTTP Range头（如 "bytes=0-1023"），透传给MinIO；
+                    范围无效时忽略并返回完整文件
+        if_none_match: HTTP If-None-Match头，透传给MinIO
+        if_modified_since: HTTP If-Modified-Since时间，透传给MinIO
+
+    Returns:
+        dict: 包含 not_modified, body (可read的流), content_length, content_type,
+              content_range (仅范围请求), etag, last_modified；
+              条件请求命中时 not_modified=True 且 body 为None（不传输内容）；
+              文件不存在返回None
+
+    Raises:
+        KsConnectionError: 查询失败时抛出
+    """
+    client = ks_minio()
+    object_key = f"{username}/{filename}"
+
+    params = {'Bucket': bucket, 'Key': object_key}
+    if byte_range:
+        params['Range'] = byte_range
+    if if_none_match:
+        params['IfNoneMatch'] = if_none_match
+    if if_modified_since:
+        params['IfModifiedSince'] = if_modified_since
+
+    try:
+        try:
+            response = client.get_object(**params)
+        except ClientError as e:
+            if byte_range and e.response.get('Error', {}).get('Code', '') == 'InvalidRange':
+                params.pop('Range')
+                response = client.get_object(**params)
+            else:
+                raise
+
+        return {
+            'not_modified': False,
+            'body': response['Body'],
+            'content_length': response.get('ContentLength'),
+            'content_type': response.get('ContentType'),
+            'content_range': response.get('ContentRange'),
+            'etag': response.get('ETag'),
+            'last_modified': response.get('LastModified')
+        }
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code', '')
+        if error_code in ('404', 'NoSuchKey'):
+            return None
+        if error_code in ('304', 'NotModified'):
+            headers = e.response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+            last_modified = headers.get('last-modified')
+            return {
+                'not_modified': True,
+                'body': None,
+                'etag': headers.get('etag'),
+                'last_modified': parsedate_to_datetime(last_modified) if last_modified else None
+            }
+        raise KsConnectionError(f"文件查询失败: {e}")
+    except Exception as e:
+        raise KsConnectionError(f"文件查询失败: {e}")
+
+
+def download_file(
+    username: str,
+    filename: str,
+    file_obj: BinaryIO,
+    bucket: str = DEFAULT_BUCKET
+) -> bool:
+    """
+    从MinIO将文件流式写入给定的文件对象（分块传输，不把文件整体读入内存）
+
+    Args:
+        username: 用户名
+        filename: 文件名
+        file_obj: 可写的二进制文件对象
+        bucket: bucket名称，默认为'kms'
+
+    Returns:
+        bool: 是否成功下载，文件不存在返回False
+
+    Raises:
+        KsConnectionError: 下载失败时抛出
+    """
+    client = ks_minio()
+    object_key = f"{username}/{filename}"
+
+    try:
+        client.download_fileobj(bucket, object_key, file_obj)
+        return True
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code', '')
+        if error_code in ('404', 'NoSuchKey'):
+            return False
+        raise KsConnectionError(f"文件下载失败: {e}")
+    except Exception as e:
+        raise KsConnectionError(f"文件下载失败: {e}")
+
+
+def get_presigned_url(
+    username: str,
+    filename: str,
+    bucket: str = DEFAULT_BUCKET,
+    expires: int = 300,
+    content_type: Optional[str] = None
+) -> str:
+    """
+    生成文件的预签名GET链接，客户端可直接从MinIO下载，数据不经过应用进程
+
+    签名在本地计算，不访问MinIO，因此不校验文件是否存在
+
+    Args:
+        username: 用户名
+        filename: 文件名
+        bucket: bucket名称，默认为'kms'
+        expires: 链接有效期(秒)，默认300
+        content_type: 可选，覆盖响应的Content-Type
+
+    Returns:
+        str: 预签名URL
+
+    Raises:
+        KsConnectionError: 生成失败时抛出
+    """
+    client = ks_minio()
+    params = {
+        'Bucket': bucket,
+        'Key': f"{username}/{filename}",
+        'ResponseContentDisposition': f"inline; filename*=UTF-8''{quote(filename)}"
+    }
+    if content_type:
+        params['ResponseContentType'] = content_type
+
+    try:
+        return client.generate_presigned_url('get_object', Params=params, ExpiresIn=expires)
+    except Exception as e:
+        raise KsConnectionError(f"生成预签名链接失败: {e}")
+
+
 def list_user_files(
     username: str,
     bucket: str = DEFAULT_BUCKET
@@ -241,7 +407,8 @@ def list_user_files(
 
 def get_owner_file_list(
     owner: str,
-    include_public: bool = False
+    include_public: bool = False,
+    fields: Optional[list[str]] = None
 ) -> list[dict]:
     """
     获取所有者的文件列表（从数据库）
@@ -251,6 +418,7 @@ def get_owner_file_list(
         include_public: 是否包含公开文件
                        - False: 只返回所有者的文件
                        - True: 返回所有者的文件 + 所有公开文件(is_public=1)
+        fields: 只返回这些字段（可选），默认返回完整元数据
 
     Returns:
         list[dict]: 文件列表，包含完整的元数据信息
@@ -258,7 +426,7 @@ def get_owner_file_list(
     Raises:
         KsConnectionError: 查询失败时抛出
     """
-    return db_get_owner_files(owner, include_public)
+    return db_get_owner_files(owner, include_public, fields)
 
 
 def set_file_public(
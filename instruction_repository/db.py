@@ -8,7 +8,7 @@ Instruction Repository - 数据库操作模块
 import logging
 from typing import List, Dict, Any, Optional
 from ks_infrastructure import db_session
-from ks_infrastructure.services.exceptions import KsConnectionError
+from ks_infrastructure.services.exceptions import KsConnectionError, KsNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -241,7 +241,7 @@ def get_instruction_by_id(instruction_id: int, owner: str) -> dict:
             result = cursor.fetchone()
             
             if not result:
-                raise ValueError("指示不存在或无权限查看")
+                raise KsNotFoundError("指示不存在或无权限查看")
             
             # 格式化时间
             if result.get('created_at'):
@@ -304,7 +304,7 @@ def update_instruction(
             check_sql = f"SELECT id FROM {TABLE_NAME} WHERE id = %s AND owner = %s"
             cursor.execute(check_sql, (instruction_id, owner))
             if not cursor.fetchone():
-                raise ValueError("指示不存在或无权限修改")
+                raise KsNotFoundError("指示不存在或无权限修改")
             
             # 构建更新语句
             update_fields = []
@@ -376,7 +376,7 @@ def delete_instruction(instruction_id: int, owner: str) -> dict:
             cursor.execute(sql, (instruction_id, owner))
             
             if cursor.rowcount == 0:
-                raise ValueError("指示不存在或无权限删除")
+                raise KsNotFoundError("指示不存在或无权限删除")
         
         return {
             "success": True,
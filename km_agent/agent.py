@@ -236,13 +236,19 @@ class KMAgent:
 
         return "\n\n".join(prompt_parts)
     
-    def reload_instructions(self):
+    def reload_instructions(self, instructions: Optional[list] = None):
         """
         Reload custom instructions from database
 
         Useful when instructions are updated during agent lifecycle
+
+        Args:
+            instructions: Already loaded instructions (e.g. from a cache);
+                          the database is only queried when omitted
         """
-        self.custom_instructions = self._load_instructions()
+        if instructions is None:
+            instructions = self._load_instructions()
+        self.custom_instructions = instructions
         if self.verbose:
             print(f"Reloaded {len(self.custom_instructions)} custom instructions")
 
@@ -24,7 +24,9 @@ MINIO_CONFIG = {
 # Qdrant向量数据库配置
 QDRANT_CONFIG = {
     "url": "http://120.92.109.164:6333",
-    "api_key": "rsdyxjh"
+    "api_key": "rsdyxjh",
+    "prefer_grpc": True,  # 使用gRPC (protobuf + HTTP/2)，比REST+JSON开销更低
+    "grpc_port": 6334
 }
 
 # OpenAI大语言模型配置
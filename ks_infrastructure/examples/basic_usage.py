@@ -19,6 +19,7 @@ def example_with_default_config():
     # 获取MySQL连接
     mysql_conn = ks_mysql()
     print(f"MySQL连接状态: {mysql_conn.is_connected()}")
+    mysql_conn.close()  # 归还连接到池
     
     # 获取MinIO客户端
     minio_client = ks_minio()
@@ -69,6 +70,7 @@ def example_with_custom_config():
     # 获取服务实例（将使用自定义配置）
     mysql_conn = ks_mysql()
     print(f"使用自定义配置的MySQL连接状态: {mysql_conn.is_connected()}")
+    mysql_conn.close()  # 归还连接到池
 
 # 方式3: 使用参数覆盖
 def example_with_parameter_override():
@@ -82,6 +84,7 @@ def example_with_parameter_override():
     # 使用参数覆盖获取服务实例
     mysql_conn = ks_mysql(charset='utf8mb4', autocommit=True)
     print(f"使用参数覆盖的MySQL连接状态: {mysql_conn.is_connected()}")
+    mysql_conn.close()  # 归还连接到池
     
     minio_client = ks_minio(region_name='us-west-1')
     print("使用参数覆盖的MinIO客户端创建成功")
@@ -16,7 +16,8 @@ from .exceptions import (
     KsInfrastructureError,
     KsConnectionError,
     KsConfigError,
-    KsServiceError
+    KsServiceError,
+    KsNotFoundError
 )
 
 __all__ = [
@@ -39,4 +40,5 @@ __all__ = [
     'KsConnectionError',
     'KsConfigError',
     'KsServiceError',
+    'KsNotFoundError',
 ]
@@ -4,19 +4,33 @@ Embedding文本嵌入服务
 
 import logging
 import requests
-from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Union
 
 from .base import get_instance_key, get_cached_instance, set_cached_instance
 from .exceptions import KsServiceError
 
 logger = logging.getLogger(__name__)
 
+# 连接池大小（同一进程内并发的向量化/检索线程共享）
+POOL_MAXSIZE = 64
+
+# 连接失败/网关错误时的重试策略（嵌入请求是幂等的，POST 也可安全重试）
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({"POST"})
+)
+
 
 class KsEmbeddingService:
     """
     Embedding服务封装类
 
     提供简单的文本嵌入功能，隐藏底层HTTP请求细节
+    所有请求复用同一个 requests.Session，保持 keep-alive 连接，避免每次嵌入都重新握手
     """
 
     def __init__(self, url: str, api_key: str):
@@ -33,14 +47,19 @@ class KsEmbeddingService:
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}"
         }
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=RETRY)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-    def create_embedding(self, text: str, model: str = "text-embedding",
+    def create_embedding(self, text: Union[str, List[str]], model: str = "text-embedding",
                         encoding_format: str = "float") -> Dict[str, Any]:
         """
         为文本创建嵌入向量
 
         Args:
-            text: 需要转换为向量的文本
+            text: 需要转换为向量的文本（或文本列表，批量请求）
             model: 模型名称，默认为"text-embedding"
             encoding_format: 编码格式，默认为"float"
 
@@ -57,7 +76,7 @@ class KsEmbeddingService:
         }
 
         try:
-            response = requests.post(self.url, headers=self.headers, json=data)
+            response = self.session.post(self.url, json=data)
 
             if response.status_code == 200:
                 return response.json()
@@ -68,6 +87,10 @@ class KsEmbeddingService:
         except requests.RequestException as e:
             raise KsServiceError(f"Embedding服务请求异常: {e}")
 
+    def close(self) -> None:
+        """关闭底层连接池"""
+        self.session.close()
+
     def get_embedding_vector(self, text: str, model: str = "text-embedding",
                             encoding_format: str = "float") -> List[float]:
         """
@@ -88,6 +111,28 @@ class KsEmbeddingService:
         return result['data'][0]['embedding']
 
 
+    def get_embedding_vectors(self, texts: List[str], model: str = "text-embedding",
+                              encoding_format: str = "float") -> List[List[float]]:
+        """
+        批量获取多段文本的嵌入向量（一次HTTP请求）
+
+        Args:
+            texts: 需要转换为向量的文本列表
+            model: 模型名称，默认为"text-embedding"
+            encoding_format: 编码格式，默认为"float"
+
+        Returns:
+            list: 与 texts 顺序一致的嵌入向量列表
+
+        Raises:
+            KsServiceError: 当请求失败时抛出
+        """
+        if not texts:
+            return []
+        result = self.create_embedding(texts, model, encoding_format)
+        items = sorted(result['data'], key=lambda item: item.get('index', 0))
+        return [item['embedding'] for item in items]
+
 def ks_embedding(**kwargs) -> KsEmbeddingService:
     """
     Embedding服务工厂函数
@@ -23,3 +23,8 @@ class KsConfigError(KsInfrastructureError):
 class KsServiceError(KsInfrastructureError):
     """服务调用错误"""
     pass
+
+
+class KsNotFoundError(ValueError):
+    """记录不存在(继承ValueError，原先按ValueError捕获的调用方不受影响)"""
+    pass
@@ -2,7 +2,9 @@
 MySQL数据库服务
 """
 
+import os
 import logging
+import threading
 import mysql.connector
 from mysql.connector import pooling
 from mysql.connector.connection import MySQLConnection
@@ -11,8 +13,27 @@ from .exceptions import KsConnectionError
 
 logger = logging.getLogger(__name__)
 
+# 连接池大小(mysql.connector上限为32)
+POOL_SIZE = min(int(os.getenv("MYSQL_POOL_SIZE", "10")), pooling.CNX_POOL_MAXSIZE)
+# 连接池耗尽时等待空闲连接的最长时间(秒)，超时才报错
+POOL_WAIT_TIMEOUT = float(os.getenv("MYSQL_POOL_WAIT_TIMEOUT", "5"))
+
 # 全局连接池实例
 _connection_pool = None
+_pool_lock = threading.Lock()
+# 连接池空位计数，ks_mysql借出连接前获取，连接close()时释放
+_pool_slots = threading.BoundedSemaphore(POOL_SIZE)
+# fork后从父进程继承的连接池，仅保留引用，防止析构时关闭共享socket
+_inherited_pools = []
+
+
+def _gevent_patched() -> bool:
+    """socket 是否已被 gevent monkey-patch（gunicorn gevent worker）"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
 
 
 def get_mysql_pool() -> pooling.MySQLConnectionPool:
@@ -24,23 +45,64 @@ def get_mysql_pool() -> pooling.MySQLConnectionPool:
     """
     global _connection_pool
     
-    if _connection_pool is None:
+    if _connection_pool is not None:
+        return _connection_pool
+
+    with _pool_lock:
+        if _connection_pool is not None:
+            return _connection_pool
+
         from ..configs import MYSQL_CONFIG
+
+        config = dict(MYSQL_CONFIG)
+        # C扩展在C代码中阻塞读写socket，gevent无法切换协程；此时改用纯Python实现
+        if 'use_pure' not in config and _gevent_patched():
+            config['use_pure'] = True
         
         try:
             _connection_pool = pooling.MySQLConnectionPool(
                 pool_name="ks_mysql_pool",
-                pool_size=10,  # 连接池大小,可根据并发需求调整
+                pool_size=POOL_SIZE,
                 pool_reset_session=True,  # 归还连接时重置会话状态
-                **MYSQL_CONFIG
+                **config
             )
-            logger.info(f"MySQL connection pool created: {MYSQL_CONFIG.get('host')}:{MYSQL_CONFIG.get('port')}, pool_size=10")
+            logger.info(f"MySQL connection pool created: {MYSQL_CONFIG.get('host')}:{MYSQL_CONFIG.get('port')}, pool_size={POOL_SIZE}")
         except mysql.connector.Error as e:
             raise KsConnectionError(f"Failed to create MySQL connection pool: {e}")
     
     return _connection_pool
 
 
+class _SlotPooledConnection:
+    """
+    池连接的包装: close()归还连接的同时释放ks_mysql占用的空位
+
+    其余属性和方法都转发给原连接，调用方照常使用 conn.close() 或 with 语句。
+    """
+
+    def __init__(self, conn: pooling.PooledMySQLConnection, slots: threading.BoundedSemaphore):
+        self._conn = conn
+        self._slots = slots
+
+    def close(self) -> None:
+        slots, self._slots = self._slots, None
+        if slots is None:
+            return  # 重复close
+        try:
+            self._conn.close()
+        finally:
+            slots.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __getattr__(self, attr):
+        return getattr(self._conn, attr)
+
+
 def ks_mysql(**kwargs) -> MySQLConnection:
     """
     从连接池获取MySQL连接
@@ -57,18 +119,30 @@ def ks_mysql(**kwargs) -> MySQLConnection:
     Note:
         使用完连接后必须调用 conn.close() 将连接归还到池中
         建议使用 db_session 上下文管理器来自动管理连接
+        连接池耗尽时最多阻塞等待 POOL_WAIT_TIMEOUT 秒，而不是立即报错
     """
+    pool = get_mysql_pool()
+    # mysql.connector的连接池不会阻塞等待，耗尽时立即抛出PoolError；
+    # 先在信号量上排队，保证拿到空位后get_connection()一定有空闲连接
+    slots = _pool_slots
+    if not slots.acquire(timeout=POOL_WAIT_TIMEOUT):
+        raise KsConnectionError(
+            f"Failed to get connection from pool: no connection available within {POOL_WAIT_TIMEOUT}s"
+        )
     try:
-        pool = get_mysql_pool()
         conn = pool.get_connection()
-        
-        # 如果有额外参数,记录警告(连接池模式下通常不应该有)
-        if kwargs:
-            logger.warning(f"Extra kwargs passed to ks_mysql (ignored in pool mode): {kwargs}")
-        
-        return conn
     except mysql.connector.Error as e:
+        slots.release()
         raise KsConnectionError(f"Failed to get connection from pool: {e}")
+    except BaseException:
+        slots.release()
+        raise
+
+    # 如果有额外参数,记录警告(连接池模式下通常不应该有)
+    if kwargs:
+        logger.warning(f"Extra kwargs passed to ks_mysql (ignored in pool mode): {kwargs}")
+
+    return _SlotPooledConnection(conn, slots)
 
 
 def close_mysql_pool():
@@ -80,3 +154,20 @@ def close_mysql_pool():
         # 连接池没有直接的close方法,但会在程序退出时自动清理
         logger.info("MySQL connection pool will be cleaned up on exit")
         _connection_pool = None
+
+
+def discard_mysql_pool_after_fork():
+    """
+    丢弃fork时从父进程继承的连接池(在gunicorn post_fork中调用)
+
+    继承的连接与父进程及其他worker共用同一个TCP socket，不能在子进程中关闭:
+    COM_QUIT会写入共享socket，纯Python实现的析构还会shutdown()，断开所有进程的连接。
+    这里不关闭也不释放旧连接池，只保留引用使其永不析构，之后首次访问数据库时重新创建连接池。
+    """
+    global _connection_pool, _pool_slots
+    pool = _connection_pool
+    _connection_pool = None
+    _pool_slots = threading.BoundedSemaphore(POOL_SIZE)  # 子进程没有借出的连接
+    if pool is not None:
+        _inherited_pools.append(pool)
+        logger.info("Dropped MySQL connection pool inherited from parent process")
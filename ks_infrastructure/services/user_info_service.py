@@ -7,7 +7,7 @@ import os
 import requests
 from typing import Dict, Any, Optional
 
-from flask import has_request_context, request
+from flask import g, has_request_context, request
 
 from ..configs import ADMIN_BACKDOOR_TOKEN, DEFAULT_USER
 from .base import get_instance_key, get_cached_instance, set_cached_instance
@@ -427,10 +427,24 @@ def is_admin(token: Optional[str] = None) -> bool:
 def get_current_user() -> str:
     """
     获取当前用户
+
+    在请求上下文中，结果缓存在 flask.g 上，同一请求内重复调用不再重新解析
     
     Returns:
         str: 当前用户名，未获取到时返回空字符串
     """
+    if not has_request_context():
+        return _resolve_current_user()
+
+    user = g.get("_ks_current_user")
+    if user is None:
+        user = _resolve_current_user()
+        g._ks_current_user = user
+    return user
+
+
+def _resolve_current_user() -> str:
+    """解析当前用户（Header X-User-Id，开发环境回退到DEFAULT_USER）"""
     if has_request_context():
         user_id = request.headers.get("X-User-Id")
         if user_id:
@@ -34,6 +34,7 @@ class KsVisionService:
         self.api_key = api_key or os.getenv("DASHSCOPE_API_KEY")
         self.base_url = base_url or "https://dashscope.aliyuncs.com/compatible-mode/v1"
         self.model = model or "qwen-vl-max"
+        self._client = None
 
     def analyze_image(self, image_base64: str, image_format: str = "png",
                      prompt: str = "请描述这张图片的内容") -> str:
@@ -56,10 +57,13 @@ class KsVisionService:
             raise KsConfigError("Vision服务API密钥未配置")
 
         try:
-            client = OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-            )
+            # 复用同一个客户端（及其 HTTP 连接池）
+            if self._client is None:
+                self._client = OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                )
+            client = self._client
 
             # Construct data URL for the image
             data_url = f"data:image/{image_format};base64,{image_base64}"
@@ -7,7 +7,7 @@ Converts PDF files to structured JSON format while preserving text and image pos
 import json
 import base64
 import fitz  # PyMuPDF
-from typing import Dict
+from typing import Dict, Iterator
 
 # Import vision service from ks_infrastructure
 try:
@@ -89,12 +89,31 @@ class PDFToJSONConverter:
         Returns:
             Dictionary containing structured PDF content
         """
-        doc = fitz.open(pdf_path)
-        result = {
-            "total_pages": len(doc),
-            "pages": []
+        pages = list(self.iter_pages(pdf_path, analyze_images, verbose, progress_callback))
+        return {
+            "total_pages": len(pages),
+            "pages": pages
         }
 
+    def iter_pages(self, pdf_path: str, analyze_images: bool = False,
+                   verbose: bool = False, progress_callback=None) -> Iterator[Dict]:
+        """
+        Parse PDF page by page, yielding each page as soon as it is ready.
+
+        Lets callers start processing early pages while later pages (and their
+        image analysis) are still being parsed.
+
+        Args:
+            pdf_path: Path to the PDF file
+            analyze_images: Whether to use AI to analyze images
+            verbose: Whether to print progress messages
+            progress_callback: Optional callback function(current_page, total_pages, message)
+
+        Yields:
+            Page dictionaries ({"page_number": int, "paragraphs": [str]})
+        """
+        doc = fitz.open(pdf_path)
+
         # Clear image cache for new conversion
         self.image_cache.clear()
 
@@ -199,10 +218,9 @@ class PDFToJSONConverter:
                     paragraphs.append(f"【此处为原图片解析信息】\n{elem['ai_description']}")
 
             page_content["paragraphs"] = paragraphs
-            result["pages"].append(page_content)
+            yield page_content
 
         doc.close()
-        return result
 
     def convert_to_json_string(self, pdf_path: str, analyze_images: bool = False,
                               verbose: bool = False, indent: int = 2) -> str:
@@ -7,17 +7,26 @@ Quote Repository - 语录数据库操作模块
 import logging
 from typing import List, Dict, Any, Optional
 from ks_infrastructure import db_session
-from ks_infrastructure.services.exceptions import KsConnectionError
+from ks_infrastructure.services.exceptions import KsConnectionError, KsNotFoundError
 
 logger = logging.getLogger(__name__)
 
 TABLE_NAME = "ks_quotes"
 
+# 本进程内是否已确认表存在（首次访问时检查，而不是在导入时连接数据库）
+_table_ensured = False
+
 
 def _ensure_table_exists():
     """
     确保ks_quotes表存在,不存在则创建
+
+    每个进程只在首次访问时执行一次,导入模块时不连接数据库
     """
+    global _table_ensured
+    if _table_ensured:
+        return
+
     create_table_sql = f"""
     CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
         id INT AUTO_INCREMENT PRIMARY KEY,
@@ -37,9 +46,7 @@ def _ensure_table_exists():
         logger.error(f"Failed to create table {TABLE_NAME}: {e}")
         raise KsConnectionError(f"Failed to create table {TABLE_NAME}: {e}")
 
-
-# 确保模块导入时检查表是否存在
-_ensure_table_exists()
+    _table_ensured = True
 
 
 def create_quote(content: str, is_fixed: int = 0) -> Dict[str, Any]:
@@ -59,6 +66,7 @@ def create_quote(content: str, is_fixed: int = 0) -> Dict[str, Any]:
     is_fixed = 1 if is_fixed else 0
 
     try:
+        _ensure_table_exists()
         with db_session() as cursor:
             # 如果设置为固定,先将其他所有语录设为非固定
             if is_fixed == 1:
@@ -96,12 +104,13 @@ def update_quote(quote_id: int, content: Optional[str] = None, is_fixed: Optiona
         raise ValueError("Content cannot be empty")
 
     try:
+        _ensure_table_exists()
         with db_session() as cursor:
             # 检查记录是否存在
             check_sql = f"SELECT id FROM {TABLE_NAME} WHERE id = %s"
             cursor.execute(check_sql, (quote_id,))
             if not cursor.fetchone():
-                raise ValueError(f"Quote with id {quote_id} not found")
+                raise KsNotFoundError(f"Quote with id {quote_id} not found")
 
             updates = []
             params = []
@@ -145,11 +154,12 @@ def delete_quote(quote_id: int) -> Dict[str, Any]:
         Dict: 删除结果
     """
     try:
+        _ensure_table_exists()
         with db_session() as cursor:
             sql = f"DELETE FROM {TABLE_NAME} WHERE id = %s"
             cursor.execute(sql, (quote_id,))
             if cursor.rowcount == 0:
-                raise ValueError(f"Quote with id {quote_id} not found")
+                raise KsNotFoundError(f"Quote with id {quote_id} not found")
         
         return {"success": True, "message": "Quote deleted successfully"}
     except ValueError as e:
@@ -178,6 +188,7 @@ def get_quotes(page: int = 1, page_size: int = 10) -> Dict[str, Any]:
     offset = (page - 1) * page_size
     
     try:
+        _ensure_table_exists()
         with db_session(dictionary=True) as cursor:
             # 获取总数
             count_sql = f"SELECT COUNT(*) as total FROM {TABLE_NAME}"
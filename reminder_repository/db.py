@@ -8,7 +8,7 @@ Reminder Repository - 数据库操作模块
 import logging
 from typing import List, Dict, Any, Optional
 from ks_infrastructure import db_session
-from ks_infrastructure.services.exceptions import KsConnectionError
+from ks_infrastructure.services.exceptions import KsConnectionError, KsNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -218,7 +218,7 @@ def get_reminder_by_id(reminder_id: int) -> dict:
             result = cursor.fetchone()
             
             if not result:
-                raise ValueError("提醒不存在")
+                raise KsNotFoundError("提醒不存在")
             
             # 格式化时间
             if result.get('created_at'):
@@ -270,7 +270,7 @@ def update_reminder(reminder_id: int, content: Optional[str] = None, is_public:
             cursor.execute(check_sql, (reminder_id,))
             current = cursor.fetchone()
             if not current:
-                raise ValueError("提醒不存在")
+                raise KsNotFoundError("提醒不存在")
             
             # 检查数量限制（如果要切换公开/私有状态）
             if is_public is not None and is_public != current['is_public']:
@@ -350,7 +350,7 @@ def delete_reminder(reminder_id: int) -> dict:
             cursor.execute(sql, (reminder_id,))
             
             if cursor.rowcount == 0:
-                raise ValueError("提醒不存在")
+                raise KsNotFoundError("提醒不存在")
         
         return {
             "success": True,
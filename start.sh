@@ -119,6 +119,12 @@ else
     echo -e "${RED}警告: 未找到 ui 目录${NC}\n"
 fi
 
+# 启动向量化 Worker
+celery -A app_api.services.vectorize_tasks:celery_app worker --loglevel=info > /tmp/km_agent_worker.log 2>&1 &
+WORKER_PID=$!
+echo -e "${GREEN}✓ 向量化 Worker 已启动 (PID: $WORKER_PID)${NC}"
+echo -e "  日志文件: /tmp/km_agent_worker.log\n"
+
 # 3. 启动后端 API 服务
 echo -e "${BLUE}[3/5] 启动后端 API 服务 (端口 5000)...${NC}"
 python3 -u -m app_api.api 2>&1 | tee /tmp/km_agent_api.log &
@@ -164,7 +170,7 @@ echo ""
 echo -e "  后端 PID: ${API_PID}"
 echo -e "  前端 PID: ${UI_PID}"
 echo ""
-echo -e "  停止服务: kill $API_PID $UI_PID"
+echo -e "  停止服务: kill $API_PID $WORKER_PID $UI_PID"
 echo -e "  或者运行: ./stop.sh"
 echo ""
 echo -e "${BLUE}提示: 浏览器访问 http://localhost:8080 开始使用${NC}"
@@ -172,11 +178,12 @@ echo ""
 
 # 保存 PID 到文件
 echo "$API_PID" > /tmp/km_agent_api.pid
+echo "$WORKER_PID" > /tmp/km_agent_worker.pid
 echo "$UI_PID" > /tmp/km_agent_ui.pid
 
 # 等待用户中断
 echo -e "按 Ctrl+C 停止所有服务..."
-trap "echo -e '\n${BLUE}正在停止服务...${NC}'; kill $API_PID $UI_PID 2>/dev/null || true; rm -f /tmp/km_agent_*.pid; echo -e '${GREEN}服务已停止${NC}'; exit 0" INT
+trap "echo -e '\n${BLUE}正在停止服务...${NC}'; kill $API_PID $WORKER_PID $UI_PID 2>/dev/null || true; rm -f /tmp/km_agent_*.pid; echo -e '${GREEN}服务已停止${NC}'; exit 0" INT
 
 # 保持脚本运行
 wait
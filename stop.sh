@@ -19,6 +19,15 @@ if [ -f /tmp/km_agent_api.pid ]; then
     rm -f /tmp/km_agent_api.pid
 fi
 
+if [ -f /tmp/km_agent_worker.pid ]; then
+    WORKER_PID=$(cat /tmp/km_agent_worker.pid)
+    if kill -0 $WORKER_PID 2>/dev/null; then
+        kill $WORKER_PID
+        echo -e "${GREEN}✓ 向量化 Worker 已停止 (PID: $WORKER_PID)${NC}"
+    fi
+    rm -f /tmp/km_agent_worker.pid
+fi
+
 if [ -f /tmp/km_agent_ui.pid ]; then
     UI_PID=$(cat /tmp/km_agent_ui.pid)
     if kill -0 $UI_PID 2>/dev/null; then
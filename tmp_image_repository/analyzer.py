@@ -22,19 +22,22 @@ DEFAULT_PROMPT = "提炼图片信息内容，重点关注非设计和排版的
 
 
 def analyze_temp_image(
-    image_path: str,
+    image_path: Optional[str] = None,
     username: str = "system",
     prompt: str = DEFAULT_PROMPT,
-    custom_filename: Optional[str] = None
+    custom_filename: Optional[str] = None,
+    image_data: Optional[bytes] = None
 ) -> Dict[str, Any]:
     """
     存储图片到临时桶并解析图片内容
 
     Args:
-        image_path: 本地图片文件路径
+        image_path: 本地图片文件路径（提供 image_data 时可省略）
         username: 用户名，默认为 'system'
         prompt: 图片分析提示词，默认为通用描述提示
         custom_filename: 自定义文件名，如果不提供则使用原文件名
+                         （使用 image_data 时必须提供）
+        image_data: 图片内容（可选），直接传入内存中的数据，无需先写临时文件
 
     Returns:
         dict: 包含以下字段：
@@ -48,13 +51,14 @@ def analyze_temp_image(
         Exception: 其他处理异常
     """
     try:
-        # 1. 检查文件是否存在
-        if not os.path.exists(image_path):
+        # 1. 检查参数（文件是否存在在读取时判断，省去一次 stat）
+        if image_data is None and not image_path:
             raise FileNotFoundError(f"图片文件不存在: {image_path}")
+        if image_data is not None and not custom_filename:
+            raise ValueError("使用 image_data 时必须提供 custom_filename")
 
         # 2. 获取文件名和扩展名
-        original_filename = os.path.basename(image_path)
-        filename = custom_filename or original_filename
+        filename = custom_filename or os.path.basename(image_path)
         basename, ext = os.path.splitext(filename)
         image_format = ext.lstrip('.').lower() or 'png'
 
@@ -65,8 +69,12 @@ def analyze_temp_image(
         filename_with_timestamp = f"{basename}_{timestamp_int}_{microsecond}{ext}"
 
         # 3. 读取图片文件
-        with open(image_path, 'rb') as f:
-            image_data = f.read()
+        if image_data is None:
+            try:
+                with open(image_path, 'rb') as f:
+                    image_data = f.read()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"图片文件不存在: {image_path}")
 
         # 4. 上传到 tmp 桶
         logger.info(f"上传图片到 tmp 桶: {filename_with_timestamp}")